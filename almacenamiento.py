@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacenamiento principal de comentarios (SQLite)
+La extracción y la generación del informe leen y escriben esta base de datos;
+el Excel de comentarios queda como exportación opcional.
+"""
+
+import sqlite3
+import json
+import hashlib
+import logging
+from contextlib import closing
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+CONFIG_DIR = Path(__file__).parent / "config"
+DEFAULT_DATABASE_FILENAME = "comentarios.db"
+COMMENTS_TABLE = "comments"
+SENTIMENT_CACHE_TABLE = "sentiment_cache"
+
+# Máximo de parámetros por consulta (límite de SQLite)
+SQL_BATCH_SIZE = 500
+
+# Columnas persistidas y su tipo en SQLite. created_time no declara tipo para
+# conservar el valor original (int epoch o string), del que depende el hash.
+COMMENT_COLUMNS = {
+    'post_number': 'INTEGER',
+    'platform': 'TEXT',
+    'campaign_name': 'TEXT',
+    'post_url': 'TEXT',
+    'post_url_original': 'TEXT',
+    'author_name': 'TEXT',
+    'comment_text': 'TEXT',
+    'created_time': '',
+    'created_time_processed': 'TEXT',
+    'fecha_comentario': 'TEXT',
+    'hora_comentario': 'TEXT',
+    'likes_count': 'INTEGER',
+    'replies_count': 'INTEGER',
+    'is_reply': 'INTEGER',
+    'author_url': 'TEXT',
+    'extraction_status': 'TEXT',
+    'created_time_raw': 'TEXT',
+    '_comment_hash': 'TEXT',
+}
+
+
+# Resúmenes equivalentes a las hojas Resumen_Posts y Stats_Plataforma del
+# Excel, como vistas: se calculan al consultarlas, no en cada escritura
+SUMMARY_VIEWS = {
+    'resumen_posts': f"""
+        SELECT post_number, platform, post_url,
+               COUNT(comment_text) AS Total_Comentarios,
+               SUM(COALESCE(likes_count, 0)) AS Total_Likes,
+               MIN(created_time_processed) AS Primera_Extraccion,
+               MAX(created_time_processed) AS Ultima_Extraccion
+        FROM {COMMENTS_TABLE}
+        GROUP BY post_number, platform, post_url
+        ORDER BY post_number
+    """,
+    'stats_plataforma': f"""
+        SELECT platform,
+               COUNT(DISTINCT post_url) AS Total_Posts,
+               COUNT(comment_text) AS Total_Comentarios,
+               ROUND(AVG(COALESCE(likes_count, 0)), 2) AS Promedio_Likes,
+               SUM(COALESCE(likes_count, 0)) AS Total_Likes
+        FROM {COMMENTS_TABLE}
+        WHERE comment_text IS NOT NULL
+        GROUP BY platform
+    """,
+}
+
+
+# ============================================================================
+# CONFIGURACIÓN Y CONEXIÓN
+# ============================================================================
+
+def get_database_filename(settings: Optional[dict] = None) -> str:
+    """
+    Devuelve el archivo de la base de datos configurado en settings.json.
+
+    Args:
+        settings: Configuración ya cargada (si es None se lee settings.json)
+
+    Returns:
+        str: Ruta del archivo SQLite
+    """
+    if settings is None:
+        try:
+            with open(CONFIG_DIR / "settings.json", 'r', encoding='utf-8') as f:
+                settings = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            settings = {}
+    return settings.get('database_filename', DEFAULT_DATABASE_FILENAME)
+
+
+def connect(database_filename: str) -> sqlite3.Connection:
+    """Abre la base de datos y crea el esquema si no existe"""
+    conn = sqlite3.connect(database_filename)
+    try:
+        columns_sql = ", ".join(
+            f'"{column}" {sql_type}'.strip() for column, sql_type in COMMENT_COLUMNS.items()
+        )
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {COMMENTS_TABLE} ({columns_sql})")
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{COMMENTS_TABLE}_hash "
+            f"ON {COMMENTS_TABLE} (_comment_hash)"
+        )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{COMMENTS_TABLE}_post_url "
+            f"ON {COMMENTS_TABLE} (post_url)"
+        )
+        for view_name, view_sql in SUMMARY_VIEWS.items():
+            conn.execute(f"CREATE VIEW IF NOT EXISTS {view_name} AS {view_sql}")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {SENTIMENT_CACHE_TABLE} ("
+            f"text_hash TEXT NOT NULL, model TEXT NOT NULL, label TEXT, probas TEXT, "
+            f"PRIMARY KEY (text_hash, model))"
+        )
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+# ============================================================================
+# CONVERSIÓN DE VALORES
+# ============================================================================
+
+def _to_sql_value(value):
+    """Convierte un valor de pandas a un tipo que SQLite pueda guardar"""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat(sep=' ')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        # Escalares de numpy
+        return _to_sql_value(value.item())
+    return value
+
+
+def _column_values(series: pd.Series) -> List:
+    """Valores de una columna listos para insertar"""
+    if series.name in ('fecha_comentario', 'hora_comentario'):
+        # Solo la fecha o la hora (el Excel puede devolver fecha y hora)
+        part = 'date' if series.name == 'fecha_comentario' else 'time'
+        return [
+            getattr(value, part)().isoformat() 
+            if isinstance(value, datetime) and value is not pd.NaT 
+            else _to_sql_value(value)
+            for value in series.tolist()
+        ]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return [
+            None if pd.isna(value) else value.isoformat(sep=' ')
+            for value in series.tolist()
+        ]
+    return [_to_sql_value(value) for value in series.tolist()]
+
+
+def _restore_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Recupera los tipos de fecha/hora que genera la extracción"""
+    if 'created_time_processed' in df.columns:
+        df['created_time_processed'] = pd.to_datetime(
+            df['created_time_processed'], errors='coerce', format='ISO8601'
+        )
+    if 'fecha_comentario' in df.columns:
+        fechas = pd.to_datetime(df['fecha_comentario'], errors='coerce', format='ISO8601')
+        df['fecha_comentario'] = fechas.dt.date.where(fechas.notna(), None)
+    if 'hora_comentario' in df.columns:
+        df['hora_comentario'] = [
+            _parse_time(value) for value in df['hora_comentario'].tolist()
+        ]
+    return df
+
+
+def _parse_time(value) -> Optional[time]:
+    """Convierte 'HH:MM:SS' (o una fecha y hora completa) a datetime.time"""
+    if not isinstance(value, str):
+        return None
+    try:
+        if ' ' in value or 'T' in value:
+            return datetime.fromisoformat(value).time()
+        return time.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+# ============================================================================
+# LECTURA Y ESCRITURA
+# ============================================================================
+
+def load_comments(database_filename: str) -> pd.DataFrame:
+    """
+    Carga todos los comentarios de la base de datos.
+
+    Args:
+        database_filename: Ruta del archivo SQLite
+
+    Returns:
+        pd.DataFrame: Comentarios (vacío si la base no existe)
+    """
+    if not Path(database_filename).exists():
+        return pd.DataFrame()
+
+    with closing(connect(database_filename)) as conn:
+        df = pd.read_sql_query(
+            f"SELECT * FROM {COMMENTS_TABLE} ORDER BY rowid", conn
+        )
+
+    if df.empty:
+        return pd.DataFrame()
+    return _restore_types(df)
+
+
+def _insert_rows(conn: sqlite3.Connection, df: pd.DataFrame) -> int:
+    """Inserta las filas del DataFrame (columnas conocidas) y devuelve cuántas"""
+    columns = [column for column in COMMENT_COLUMNS if column in df.columns]
+    ignored = [column for column in df.columns if column not in COMMENT_COLUMNS]
+    if ignored:
+        logger.warning(f"Columns not stored in database: {ignored}")
+    if df.empty:
+        return 0
+
+    rows = list(zip(*(_column_values(df[column]) for column in columns)))
+    columns_sql = ", ".join(f'"{column}"' for column in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(
+        f"INSERT INTO {COMMENTS_TABLE} ({columns_sql}) VALUES ({placeholders})",
+        rows
+    )
+    return len(rows)
+
+
+def append_comments(database_filename: str, df: pd.DataFrame) -> bool:
+    """
+    Sincroniza la base de datos con el DataFrame combinado escribiendo solo
+    la diferencia: inserta las filas cuyo _comment_hash no está guardado y
+    elimina las entradas de registro (sin comentario) que ya no aparecen.
+    Los comentarios guardados nunca se reescriben ni se borran, así que el
+    coste de escritura es proporcional a los datos nuevos.
+
+    Args:
+        database_filename: Ruta del archivo SQLite
+        df: DataFrame combinado, con la columna _comment_hash
+
+    Returns:
+        bool: True si se guardó exitosamente
+    """
+    hashes = set(df['_comment_hash'].dropna())
+
+    try:
+        with closing(connect(database_filename)) as conn, conn:
+            stored = conn.execute(
+                f"SELECT _comment_hash, comment_text IS NULL FROM {COMMENTS_TABLE}"
+            ).fetchall()
+            stored_hashes = {row_hash for row_hash, _ in stored}
+            obsolete_registry = [
+                (row_hash,) for row_hash, is_registry in stored
+                if is_registry and row_hash not in hashes
+            ]
+            if obsolete_registry:
+                conn.executemany(
+                    f"DELETE FROM {COMMENTS_TABLE} "
+                    f"WHERE _comment_hash = ? AND comment_text IS NULL",
+                    obsolete_registry
+                )
+            inserted = _insert_rows(
+                conn, df[~df['_comment_hash'].isin(stored_hashes)]
+            )
+        logger.info(
+            f"Database updated: {database_filename} (+{inserted} rows, "
+            f"-{len(obsolete_registry)} registry entries)"
+        )
+        return True
+    except sqlite3.Error as e:
+        logger.error(f"Error updating database {database_filename}: {e}", exc_info=True)
+        return False
+
+
+def save_comments(database_filename: str, df: pd.DataFrame) -> bool:
+    """
+    Reemplaza el contenido de la base de datos por el DataFrame, en una sola
+    transacción.
+
+    Args:
+        database_filename: Ruta del archivo SQLite
+        df: DataFrame con los comentarios
+
+    Returns:
+        bool: True si se guardó exitosamente
+    """
+    try:
+        with closing(connect(database_filename)) as conn, conn:
+            conn.execute(f"DELETE FROM {COMMENTS_TABLE}")
+            inserted = _insert_rows(conn, df)
+        logger.info(f"Database saved successfully: {database_filename} ({inserted} rows)")
+        return True
+    except sqlite3.Error as e:
+        logger.error(f"Error saving database {database_filename}: {e}", exc_info=True)
+        return False
+
+
+# ============================================================================
+# CACHÉ DE SENTIMIENTOS
+# ============================================================================
+
+def text_hash(text: str) -> str:
+    """Hash del texto de un comentario (clave de la caché de sentimientos)"""
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+def load_sentiment_cache(
+    database_filename: str, 
+    model_name: str, 
+    text_hashes: Iterable[str]
+) -> Dict[str, dict]:
+    """
+    Busca en la caché los sentimientos ya calculados por un modelo.
+
+    Args:
+        database_filename: Ruta del archivo SQLite
+        model_name: Modelo que calculó los sentimientos
+        text_hashes: Hashes de los textos a buscar
+
+    Returns:
+        Dict[str, dict]: {hash del texto: {etiqueta: probabilidad}}
+    """
+    text_hashes = list(text_hashes)
+    cached = {}
+    if not text_hashes or not Path(database_filename).exists():
+        return cached
+
+    with closing(connect(database_filename)) as conn:
+        for start in range(0, len(text_hashes), SQL_BATCH_SIZE):
+            chunk = text_hashes[start:start + SQL_BATCH_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(
+                f"SELECT text_hash, probas FROM {SENTIMENT_CACHE_TABLE} "
+                f"WHERE model = ? AND text_hash IN ({placeholders})",
+                [model_name, *chunk]
+            )
+            for row_hash, probas in rows:
+                cached[row_hash] = json.loads(probas)
+    return cached
+
+
+def save_sentiment_cache(
+    database_filename: str, 
+    model_name: str, 
+    entries: Dict[str, dict]
+) -> bool:
+    """
+    Guarda en la caché los sentimientos calculados por un modelo.
+
+    Args:
+        database_filename: Ruta del archivo SQLite
+        model_name: Modelo que calculó los sentimientos
+        entries: {hash del texto: {etiqueta: probabilidad}}
+
+    Returns:
+        bool: True si se guardó exitosamente
+    """
+    if not entries:
+        return True
+    rows = [
+        (row_hash, model_name, max(probas, key=probas.get), json.dumps(probas))
+        for row_hash, probas in entries.items()
+    ]
+    try:
+        with closing(connect(database_filename)) as conn, conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {SENTIMENT_CACHE_TABLE} "
+                f"(text_hash, model, label, probas) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return True
+    except sqlite3.Error as e:
+        logger.error(f"Error saving sentiment cache {database_filename}: {e}", exc_info=True)
+        return False
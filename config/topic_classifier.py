@@ -4,225 +4,392 @@
 Clasificador de Temas para Comentarios de Campañas
 Personalizable por campaña/producto
 """
+import json
 import re
-from typing import Callable
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
-def create_topic_classifier() -> Callable[[str], str]:
+CONFIG_DIR = Path(__file__).parent
+
+# ============================================================================
+# REGLAS DEL CLASIFICADOR POR CAMPAÑA
+# ============================================================================
+# Las reglas de cada campaña viven en config/topic_rules/<campaña>.json:
+#
+#   {
+#     "metadata": {"campaign_name": ..., "product": ..., "version": ...},
+#     "rules": [
+#       {"topic": "...", "keywords": ["palabra", ...], "patterns": ["regex", ...]},
+#       ...
+#     ],
+#     "valid_shorts": {"ok": "Otros / Neutro", ...}
+#   }
+#
+# - Las reglas van en orden de prioridad: gana la primera que coincide.
+# - "keywords" son textos literales (en minúsculas) que se buscan dentro del
+#   comentario; "patterns" son expresiones regulares y se reservan para lo
+#   que no es literal (anclas, comodines, repeticiones...).
+# - "valid_shorts" son palabras muy cortas que NO son spam.
+#
+# El archivo activo se elige con "topic_rules_file" en config/settings.json.
+
+DEFAULT_TOPIC_RULES_FILE = "topic_rules/navidad.json"
+
+SPAM_TOPIC = 'Ruido / Spam'
+DEFAULT_TOPIC = 'Otros / Neutro'
+
+
+def get_topic_rules_filename(settings: Optional[dict] = None) -> Path:
+    """
+    Ruta del archivo de reglas de la campaña activa.
+
+    Args:
+        settings: Configuración ya cargada (si no, se lee config/settings.json)
+
+    Returns:
+        Path: Ruta del archivo de reglas
+    """
+    if settings is None:
+        try:
+            with open(CONFIG_DIR / "settings.json", 'r', encoding='utf-8') as f:
+                settings = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            settings = {}
+    return CONFIG_DIR / settings.get('topic_rules_file', DEFAULT_TOPIC_RULES_FILE)
+
+
+def load_topic_rules(path: Optional[Path] = None) -> dict:
+    """
+    Carga y valida un archivo de reglas de temas.
+
+    Args:
+        path: Archivo de reglas (por defecto, el de la campaña activa)
+
+    Returns:
+        dict: Reglas con las claves metadata, rules y valid_shorts
+    """
+    path = Path(path) if path is not None else get_topic_rules_filename()
+    with open(path, 'r', encoding='utf-8') as f:
+        rule_set = json.load(f)
+
+    for position, rule in enumerate(rule_set.get('rules', []), start=1):
+        if not rule.get('topic'):
+            raise ValueError(f"{path.name}: la regla {position} no tiene 'topic'")
+        if not rule.get('keywords') and not rule.get('patterns'):
+            raise ValueError(f"{path.name}: la regla '{rule['topic']}' no tiene keywords ni patterns")
+        for pattern in rule.get('patterns', []):
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"{path.name}: patrón inválido en '{rule['topic']}': {pattern!r} ({e})")
+
+    rule_set.setdefault('metadata', {})
+    rule_set.setdefault('valid_shorts', {})
+    return rule_set
+
+
+# ============================================================================
+# AUTÓMATA DE PALABRAS CLAVE
+# ============================================================================
+
+def keyword_trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Expresión regular en forma de trie para un conjunto de palabras clave.
+
+    Las palabras con prefijo común comparten rama ("real", "realidad es otra"
+    -> "real(?:idad\\ es\\ otra)?"), así que en cada posición el motor de
+    regex solo sigue el camino que marca el texto: el costo no crece con el
+    número de palabras. En cada nodo se prueban primero las extensiones, por
+    lo que se obtiene la palabra más larga que empieza en esa posición.
+
+    Args:
+        keywords: Palabras clave literales
+
+    Returns:
+        str: Patrón equivalente a la alternancia de todas las palabras
     """
-    Clasificador V3 (Navidad): 
-    - Reduce 'Otros' capturando críticas a los actores/influencers (Lalo & Cota).
-    - Mejora detección de Spam complejo (letras repetidas, secuencias random).
-    - Refina quejas de sabor/calidad.
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: dict) -> str:
+        is_end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if is_end:
+            return ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+        return body
+
+    return build(trie)
+
+
+class KeywordAutomaton:
+    """
+    Buscador de muchas palabras clave a la vez (estilo Aho-Corasick).
+
+    Todas las palabras de todas las reglas se compilan en un único trie que
+    se recorre en una pasada del texto; cada palabra encontrada aporta la
+    regla de mayor prioridad que le corresponde.
+    """
+
+    def __init__(self, keyword_rules: Dict[str, int]):
+        """
+        Args:
+            keyword_rules: Palabra clave -> índice de su regla
+        """
+        # En una posición el trie devuelve la palabra más larga; las más
+        # cortas que también empiezan ahí son sus prefijos, así que cada
+        # palabra hereda la mejor regla de sus prefijos
+        self.best_rule_by_keyword = {}
+        for keyword in keyword_rules:
+            prefix_rules = [
+                keyword_rules[keyword[:size]]
+                for size in range(1, len(keyword) + 1)
+                if keyword[:size] in keyword_rules
+            ]
+            self.best_rule_by_keyword[keyword] = min(prefix_rules)
+
+        # Búsqueda anticipada para obtener también coincidencias solapadas
+        pattern = keyword_trie_pattern(keyword_rules)
+        self._finditer = re.compile(f'(?=({pattern}))').finditer if pattern else None
+
+    def best_rule(self, text: str) -> Optional[int]:
+        """Índice de la regla de mayor prioridad con alguna palabra en el texto"""
+        if self._finditer is None:
+            return None
+        best = None
+        best_rule_by_keyword = self.best_rule_by_keyword
+        for match in self._finditer(text):
+            rule_index = best_rule_by_keyword[match.group(1)]
+            if best is None or rule_index < best:
+                if rule_index == 0:
+                    return 0
+                best = rule_index
+        return best
+
+
+# ============================================================================
+# MOTOR DE CLASIFICACIÓN
+# ============================================================================
+
+class TopicClassifier:
+    """
+    Motor de clasificación de temas de una campaña.
+
+    Las palabras clave de todas las reglas se buscan con un solo autómata y
+    solo las reglas con patrones de verdad pasan por regex, y únicamente si
+    tienen más prioridad que la mejor palabra clave encontrada.
     """
 
-    def classify_topic(comment: str) -> str:
+    def __init__(self, rule_set: Optional[dict] = None):
+        """
+        Args:
+            rule_set: Reglas ya cargadas (por defecto, las de la campaña activa)
+        """
+        rule_set = rule_set if rule_set is not None else load_topic_rules()
+        self.metadata = rule_set.get('metadata', {})
+        self.valid_shorts = dict(rule_set.get('valid_shorts', {}))
+        self.topics = [rule['topic'] for rule in rule_set['rules']]
+
+        # Cada regla como un único patrón (para la clasificación de referencia)
+        self.rules: List[Tuple[str, str]] = []
+        keyword_rules: Dict[str, int] = {}
+        self._pattern_searches = []
+        for index, rule in enumerate(rule_set['rules']):
+            keywords = rule.get('keywords', [])
+            patterns = rule.get('patterns', [])
+            for keyword in keywords:
+                keyword_rules.setdefault(keyword, index)
+            alternatives = ([keyword_trie_pattern(keywords)] if keywords else []) + patterns
+            self.rules.append((rule['topic'], '|'.join(alternatives)))
+            if patterns:
+                self._pattern_searches.append((index, re.compile('|'.join(patterns)).search))
+
+        self._automaton = KeywordAutomaton(keyword_rules)
+
+    def match_rule(self, comment_lower: str) -> Optional[int]:
+        """Índice de la primera regla que coincide (None si ninguna)"""
+        best = self._automaton.best_rule(comment_lower)
+        for index, search in self._pattern_searches:
+            if best is not None and index >= best:
+                break
+            if search(comment_lower):
+                return index
+        return best
+
+    def resolve(self, comment_lower: str, rule_index: Optional[int]) -> str:
+        """Tema final a partir de la regla encontrada (o de los casos cortos)"""
+        if rule_index is not None:
+            return self.topics[rule_index]
+        if comment_lower in self.valid_shorts:
+            return self.valid_shorts[comment_lower]
+        if len(comment_lower) < 3:
+            return SPAM_TOPIC
+        return DEFAULT_TOPIC
+
+    def classify(self, comment: str) -> str:
+        """Clasifica un comentario"""
         # Limpieza básica
         comment_lower = str(comment).lower().strip()
-        
+
         # Si el comentario es vacío
         if not comment_lower:
-            return 'Ruido / Spam'
-
-        # ------------------------------------------------------------------
-        # 1. Valoración: "No IA" y Autenticidad (Insight Clave)
-        # ------------------------------------------------------------------
-        if re.search(
-            r'no (es|usaron|hacerlo con) ia|inteligencia artificial|'
-            r'me gusta que no|real|humano|milagro.*no.*ia|'
-            r'no la ocultan.*oct[oó]gonos', # Respuesta específica sobre transparencia
-            comment_lower
-        ):
-            return 'Valoración: Autenticidad (No IA)'
-
-        # ------------------------------------------------------------------
-        # 2. Crítica: Casting, Actores y Ejecución (NUEVO - Reduce Otros)
-        # ------------------------------------------------------------------
-        # Captura quejas sobre "Lalo y Cota", "familia falsa", "enchufados"
-        if re.search(
-            r'lalo|cota|señoras|pasivo|enchufados|fritos|tutis|'
-            r'familia de verdad|casado|actores|comercial|falsos|'
-            r'mentiras|l[áa]mpara|contenido|esconda|pareja|'
-            r'quienes son|no había una familia|semejante empresa',
-            comment_lower
-        ):
-            return 'Crítica Influencer'
-
-        # ------------------------------------------------------------------
-        # 3. Desigualdad Social (Contexto País)
-        # ------------------------------------------------------------------
-        if re.search(
-            r'estrato|soacha|30m2|30 m2|clase alta|clase baja|'
-            r'ricos|pobres|barrio|apartamento|realidad es otra|'
-            r'gente.*navidad',
-            comment_lower
-        ):
-            return 'Crítica Social / Desigualdad'
-
-        # ------------------------------------------------------------------
-        # 4. Política Dura
-        # ------------------------------------------------------------------
-        if re.search(
-            r'petro|urib|derecha|izquierda|corrupci[oó]n|pa[ií]s|'
-            r'gobierno|policía|patria|firme por|negocios sucios|'
-            r'dignidad|verguensa|vergüenza|ambicioso|borregos|'
-            r'libertad|socialis|capitalis',
-            comment_lower
-        ):
-            return 'Política y Gobierno'
-
-        # ------------------------------------------------------------------
-        # 5. Salud, Calidad y Sabor (Reforzado)
-        # ------------------------------------------------------------------
-        if re.search(
-            r'veneno|t[óo]xico|daño|envenenado|remedio|qu[íi]mico|'
-            r'pura agua|maicena|sabor a|mala calidad|est[áa] muy mala|'
-            r'p[eé]simo|p[eé]sima|horrible|gas|vomit|🤢|'
-            r'oct[áa]gono|sello|az[úu]car|diabetes|diab[eé]tico|'
-            r'no nutre|enferma|lacto suero|c[áa]ncer|muerte',
-            comment_lower
-        ):
-            return 'Queja: Salud, Calidad y Sabor'
-
-        # ------------------------------------------------------------------
-        # 6. Precio Elevado
-        # ------------------------------------------------------------------
-        if re.search(
-            r'costoso|car[oó]|atraco|nubes|vale la pena|'
-            r'\$|5000|mil pesos|imposible poder comer|'
-            r'est[aá]n tan|muy caro|bajenle|subieron|plata',
-            comment_lower
-        ):
-            return 'Queja: Precio Elevado'
-
-        # ------------------------------------------------------------------
-        # 7. Cultura Pop, Memes y Random
-        # ------------------------------------------------------------------
-        if re.search(
-            r'one piece|happy wheels|terrifier|eggman|master plan|'
-            r'mapa|sonido de|blusa de|jojojo|risa|teoría|lógica',
-            comment_lower
-        ):
-            return 'Cultura Pop / Memes / Random'
-
-        # ------------------------------------------------------------------
-        # 8. Navidad y Religión
-        # ------------------------------------------------------------------
-        if re.search(
-            r'am[eé]n|dios|bendiga|bendiciones|jesús|nacimiento|'
-            r'navidad|nabida|neveded|espíritu|fe |creador|'
-            r'noche buena|diciembre',
-            comment_lower
-        ):
-            return 'Religioso / Saludos Navideños'
-
-        # ------------------------------------------------------------------
-        # 9. Nostalgia y Tradición
-        # ------------------------------------------------------------------
-        if re.search(
-            r'infancia|niñez|años 90|noventa|antes|'
-            r'cuando eran|recuerdo|antaño|crecí con|tradición|'
-            r'historia|siempre',
-            comment_lower
-        ):
-            return 'Nostalgia y Tradición'
-
-        # ------------------------------------------------------------------
-        # 10. Aprobación General / Brand Love
-        # ------------------------------------------------------------------
-        if re.search(
-            r'genial|hermos[oa]|bell[oa]|divino|lindo|bonito|'
-            r'me gusta|me encanta|ame\b|amé|amo\b|'
-            r'excelente|increíble|delicia|rico|'
-            r'buena imagen|te ves bn|alpinista|mejor marca|'
-            r'conecta|ternura|te amoooo|buenas vibras|'
-            r'bienestar|top|orgullosa|fan',
-            comment_lower
-        ):
-            return 'Aprobación General / Brand Love'
-
-        # ------------------------------------------------------------------
-        # 11. Productos Específicos
-        # ------------------------------------------------------------------
-        if re.search(
-            r'avena|kumis|bon yurt|bonyort|leche|yogurt|'
-            r'queso|arequipe|producto|alpinito|finesse',
-            comment_lower
-        ):
-            return 'Mención Producto Específico'
-        
-        # ------------------------------------------------------------------
-        # 12. Preguntas / Call to Action
-        # ------------------------------------------------------------------
-        if re.search(
-            r'por qu[eé]|c[oó]mo|d[oó]nde|expli|receta|'
-            r'ingredientes|mascarilla|puedo',
-            comment_lower
-        ):
-            return 'Pregunta / Solicitud'
-
-        # ------------------------------------------------------------------
-        # 13. Animales
-        # ------------------------------------------------------------------
-        if re.search(
-            r'perr(o|ito)|gat(o|ico)|mascota|animal',
-            comment_lower
-        ):
-            return 'Tema: Animales'
-
-        # ------------------------------------------------------------------
-        # 14. Ruido / Spam (Filtro Mejorado)
-        # ------------------------------------------------------------------
-        is_spam_pattern = re.search(
-            r'tinga linga|'      # Patrón específico spam
-            r'[pP]+0*9+|'        # Secuencias tipo Pp099, p99
-            r'^[0-9]+$|'         # Solo números (ej: "6")
-            r'(.)\1{4,}|'        # Letras repetidas mas de 4 veces (vuuuuuu)
-            r'^jajaj?a?+$|'      # Solo risas sin texto
-            r'^hola$|'           # Saludos vacíos
-            r'emoji|🤡|'        # Emojis ofensivos solos
-            r'%%%%|'             # Caracteres especiales solos
-            r'^[a-zA-Z]$',       # Una sola letra (ej: "P")
-            comment_lower
-        )
-        
-        if is_spam_pattern:
-            return 'Ruido / Spam'
-        
-        # Palabras muy cortas que NO son spam
-        valid_shorts = ['ty', 'si', 'no', 'ok', 'top', 'wow']
-        if comment_lower in valid_shorts:
-             return 'Aprobación General / Brand Love' if comment_lower in ['ty', 'top', 'wow'] else 'Otros / Neutro'
-
-        if len(comment_lower) < 3: 
-             return 'Ruido / Spam'
-
-        # ------------------------------------------------------------------
-        # DEFAULT
-        # ------------------------------------------------------------------
-        return 'Otros / Neutro'
-
-    return classify_topic
+            return SPAM_TOPIC
+
+        return self.resolve(comment_lower, self.match_rule(comment_lower))
+
+    __call__ = classify
+
+    def classify_series(self, comments: "pd.Series") -> "pd.Series":
+        """
+        Clasifica una columna completa de comentarios.
+
+        Cada fila se resuelve con una sola pasada del autómata (más los
+        patrones que hagan falta); la limpieza del texto y los casos sin
+        regla se calculan sobre toda la columna. Devuelve los mismos temas
+        que classify() aplicado fila a fila.
+
+        Args:
+            comments: Serie con los textos de los comentarios
+
+        Returns:
+            pd.Series: Tema de cada comentario (mismo índice que la entrada)
+        """
+        import pandas as pd
+
+        # Dtype object: las búsquedas usan el motor re de Python (los patrones
+        # con referencias hacia atrás no son compatibles con pyarrow). Se
+        # trabaja por posición (RangeIndex) y el índice original se restaura
+        # al final, así que funciona también con índices repetidos
+        comments_lower = pd.Series(
+            [str(comment) for comment in comments], dtype=object
+        ).str.lower().str.strip()
+        topics = pd.Series(SPAM_TOPIC, index=comments_lower.index, dtype=object)
+
+        # Los comentarios vacíos se quedan como spam
+        pending = comments_lower[comments_lower != '']
+        rule_indexes = pending.map(self.match_rule)
+        matched = rule_indexes.notna()
+        topics[rule_indexes[matched].index] = [self.topics[int(index)] for index in rule_indexes[matched]]
+        pending = pending[~matched]
+
+        # Sin regla: casos cortos válidos, spam (< 3 caracteres) o neutro
+        shorts = pending.map(self.valid_shorts)
+        is_short = shorts.notna()
+        topics[shorts[is_short].index] = shorts[is_short]
+        pending = pending[~is_short]
+        topics[pending[pending.str.len() >= 3].index] = DEFAULT_TOPIC
+
+        return topics.set_axis(comments.index)
+
+
+def classify_topic_reference(comment: str, classifier: TopicClassifier) -> str:
+    """
+    Clasificación de referencia regla a regla (re.search con el patrón
+    completo de cada regla); se usa para verificar que el motor da los
+    mismos temas.
+    """
+    comment_lower = str(comment).lower().strip()
+    if not comment_lower:
+        return SPAM_TOPIC
+
+    for topic, pattern in classifier.rules:
+        if re.search(pattern, comment_lower):
+            return topic
+
+    if comment_lower in classifier.valid_shorts:
+        return classifier.valid_shorts[comment_lower]
+    if len(comment_lower) < 3:
+        return SPAM_TOPIC
+    return DEFAULT_TOPIC
+
+
+def create_topic_classifier() -> Callable[[str], str]:
+    """
+    Clasificador de la campaña activa (config/settings.json -> topic_rules_file).
+    """
+    return TopicClassifier().classify
+
+
+def classify_series(comments: "pd.Series") -> "pd.Series":
+    """
+    Clasifica la columna de comentarios con el clasificador de la campaña activa.
+
+    Args:
+        comments: Serie con los textos de los comentarios
+
+    Returns:
+        pd.Series: Tema de cada comentario
+    """
+    return TopicClassifier().classify_series(comments)
+
+
+def check_classifier_parity(
+    texts: Iterable[str],
+    classifier: Optional[TopicClassifier] = None
+) -> List[Tuple[str, str, str]]:
+    """
+    Compara el motor con la clasificación de referencia regla a regla sobre
+    los textos dados. Ambas usan el mismo archivo de reglas, así que esto
+    verifica el motor, no las reglas; la regresión frente al clasificador V3
+    original está en tests/test_topic_classifier.py.
+
+    Args:
+        texts: Comentarios a comparar
+        classifier: Motor a verificar (por defecto, el de la campaña activa)
+
+    Returns:
+        List[Tuple[str, str, str]]: (texto, tema de referencia, tema del
+        motor) de cada discrepancia; vacía si son idénticos
+    """
+    classifier = classifier or TopicClassifier()
+    mismatches = []
+    for text in texts:
+        expected = classify_topic_reference(text, classifier)
+        actual = classifier.classify(text)
+        if expected != actual:
+            mismatches.append((text, expected, actual))
+    return mismatches
+
+
 # ============================================================================
 # METADATA DE LA CAMPAÑA (OPCIONAL)
 # ============================================================================
 
-CAMPAIGN_METADATA = {
-    'campaign_name': 'Alpina - Kéfir',
-    'product': 'Kéfir Alpina',
-    'categories': [
-        'Preguntas sobre el Producto',
-        'Comparación con Kéfir Casero/Artesanal',
-        'Ingredientes y Salud',
-        'Competencia y Disponibilidad',
-        'Opinión General del Producto',
-        'Fuera de Tema / No Relevante',
-        'Otros'
-    ],
-    'version': '1.0',
-    'last_updated': '2025-11-20'
-}
+def get_campaign_metadata() -> dict:
+    """
+    Retorna metadata de la campaña activa (del archivo de reglas); las
+    categorías son los temas que puede asignar el clasificador.
+    """
+    rule_set = load_topic_rules()
+    metadata = dict(rule_set['metadata'])
+    categories = [rule['topic'] for rule in rule_set['rules']]
+    categories += [topic for topic in rule_set['valid_shorts'].values()]
+    categories.append(DEFAULT_TOPIC)
+    metadata['categories'] = list(dict.fromkeys(categories))
+    return metadata
 
 
-def get_campaign_metadata() -> dict:
-    """Retorna metadata de la campaña"""
-    return CAMPAIGN_METADATA.copy()
+if __name__ == "__main__":
+    # Verificación del motor frente a sus reglas: python config/topic_classifier.py [archivo.xlsx]
+    import pandas as pd
+
+    workbook = sys.argv[1] if len(sys.argv) > 1 else 'Comentarios Campaña.xlsx'
+    comments = pd.read_excel(workbook, sheet_name='Comentarios')['comment_text'].dropna()
+    mismatches = check_classifier_parity(comments)
+    series_topics = classify_series(comments)
+    mismatches += [
+        (text, expected, actual)
+        for text, expected, actual in zip(comments, comments.map(create_topic_classifier()), series_topics)
+        if expected != actual
+    ]
+    print(f"{len(comments)} comentarios comparados, {len(mismatches)} discrepancias")
+    for text, expected, actual in mismatches[:20]:
+        print(f"  {text[:60]!r}: {expected} != {actual}")
+    sys.exit(1 if mismatches else 0)
@@ -6,18 +6,28 @@ Procesa URLs de Facebook, Instagram y TikTok usando APIs de Apify
 """
 
 import pandas as pd
-from apify_client import ApifyClient
+from apify_client import ApifyClient, ApifyClientAsync
 import time
+import asyncio
 import logging
 import html
 import unicodedata
 import os
+import sys
 import json
 import random
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from pathlib import Path
 from datetime import datetime
 import hashlib
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterable, Iterator, AsyncIterator
+
+from almacenamiento import (
+    load_comments, save_comments, append_comments, get_database_filename
+)
 
 # ============================================================================
 # CONFIGURACIÓN DE LOGGING
@@ -34,6 +44,44 @@ logger = logging.getLogger(__name__)
 APIFY_TOKEN = os.environ.get("APIFY_TOKEN")
 CONFIG_DIR = Path(__file__).parent / "config"
 
+# Actores de Apify usados por cada plataforma
+APIFY_ACTORS = {
+    'Facebook': 'apify/facebook-comments-scraper',
+    'Instagram': 'apify/instagram-scraper',
+    'TikTok': 'clockworks/tiktok-comments-scraper'
+}
+
+# Opciones de run_input que piden los comentarios del más reciente al más
+# antiguo. Solo estas plataformas usan la marca de agua por fecha en el modo
+# incremental; las demás descargan max_comments completo y descartan los
+# comentarios ya guardados por su _comment_hash
+NEWEST_FIRST_RUN_INPUT = {
+    'Facebook': {"viewOption": "RECENT_ACTIVITY"}
+}
+
+# Estados finales de un run de Apify
+RUN_TERMINAL_STATUSES = ["SUCCEEDED", "FAILED", "TIMED-OUT", "ABORTED"]
+
+# Campos de fecha de los comentarios de cada plataforma, por prioridad
+COMMENT_DATE_FIELDS = {
+    'Facebook': [
+        'createdTime', 'timestamp', 'publishedTime', 
+        'date', 'createdAt', 'publishedAt'
+    ],
+    'Instagram': [
+        'timestamp', 'createdTime', 'publishedAt', 
+        'date', 'createdAt', 'taken_at'
+    ],
+    'TikTok': ['createTime']
+}
+
+# Campos de los items de Apify que pueden contener la URL de entrada
+# (se usan para repartir los resultados de un run por lotes)
+BATCH_SOURCE_URL_FIELDS = [
+    'inputUrl', 'input', 'submittedVideoUrl', 'facebookUrl', 
+    'postUrl', 'videoWebUrl', 'url'
+]
+
 
 # ============================================================================
 # FUNCIONES DE CARGA DE CONFIGURACIÓN
@@ -157,8 +205,30 @@ class SocialMediaScraper:
             'successful': 0,
             'failed': 0,
             'no_comments': 0,
-            'invalid_comments': 0
+            'invalid_comments': 0,
+            'known_comments_skipped': 0
         }
+        # Protege extraction_stats y failed_urls cuando hay varios workers
+        self._stats_lock = threading.Lock()
+        # Marcas de agua por post_url para la extracción incremental
+        # (ver load_watermarks); vacío = extracción completa
+        self.watermarks: Dict[str, dict] = {}
+        # _comment_hash de los comentarios ya guardados (modo incremental)
+        self.known_comment_hashes = set()
+        # URLs sin comentarios nuevos respecto a su marca de agua
+        self.up_to_date_urls = set()
+        # Duración esperada de los runs por plataforma (ver load_run_profiles)
+        self.run_profiles: Dict[str, dict] = {}
+        # Runs que superaron el tiempo de espera y siguen en curso en Apify,
+        # por (plataforma, urls); el siguiente intento los retoma
+        self.pending_runs: Dict[Tuple[str, Tuple[str, ...]], dict] = {}
+        # Diario de checkpoints (ver ExtractionJournal); None = desactivado
+        self.journal: Optional['ExtractionJournal'] = None
+
+    def _increment_stat(self, key: str, amount: int = 1) -> None:
+        """Incrementa un contador de extraction_stats de forma thread-safe"""
+        with self._stats_lock:
+            self.extraction_stats[key] += amount
 
     def detect_platform(self, url: str) -> Optional[str]:
         """
@@ -210,92 +280,490 @@ class SocialMediaScraper:
             logger.warning(f"Could not fix encoding: {e}")
             return str(text)
 
-    def _wait_for_run_finish(self, run: dict) -> Optional[dict]:
+    def _build_run_input(
+        self, 
+        platform: str, 
+        urls: List[str], 
+        max_comments: int
+    ) -> dict:
+        """
+        Construye el run_input del actor de Apify para una plataforma.
+        
+        Args:
+            platform: Nombre de la plataforma (normalizado)
+            urls: URLs de las publicaciones
+            max_comments: Número máximo de comentarios por post
+            
+        Returns:
+            dict: run_input para el actor de la plataforma
+        """
+        # En modo incremental se piden los más recientes primero si el actor lo permite
+        order = NEWEST_FIRST_RUN_INPUT.get(platform, {}) if self.watermarks else {}
+        if platform == 'Facebook':
+            return {
+                "startUrls": [{"url": self.clean_url(url)} for url in urls], 
+                "maxComments": max_comments, 
+                **order
+            }
+        if platform == 'Instagram':
+            return {
+                "directUrls": list(urls), 
+                "resultsType": "comments", 
+                "resultsLimit": max_comments
+            }
+        if platform == 'TikTok':
+            return {
+                "postURLs": [self.clean_url(url) for url in urls], 
+                "maxCommentsPerPost": max_comments
+            }
+        raise ValueError(f"Unsupported platform: {platform}")
+
+    def _process_results(
+        self, 
+        platform: str, 
+        items: Iterable[dict], 
+        url: str, 
+        post_number: int, 
+        campaign_info: dict
+    ) -> List[dict]:
+        """Procesa los resultados de Apify con el método de la plataforma"""
+        processors = {
+            'Facebook': self._process_facebook_results,
+            'Instagram': self._process_instagram_results,
+            'TikTok': self._process_tiktok_results
+        }
+        return processors[platform](items, url, post_number, campaign_info)
+
+    def _validate_comments(self, result: List[dict]) -> List[dict]:
+        """
+        Filtra los comentarios que no tienen los campos mínimos requeridos.
+        
+        Args:
+            result: Comentarios devueltos por una función de scraping
+            
+        Returns:
+            List[dict]: Comentarios válidos
+        """
+        valid_comments = []
+        for comment in result:
+            is_valid, error_msg = validate_comment_data(comment)
+            if is_valid:
+                valid_comments.append(comment)
+            else:
+                logger.warning(f"Invalid comment data: {error_msg}")
+                self._increment_stat('invalid_comments')
+        return valid_comments
+
+    def _expected_run_duration(self, platform: Optional[str], n_posts: int = 1) -> Optional[float]:
+        """Duración esperada (segundos) de un run según el perfil aprendido"""
+        profile = self.run_profiles.get(platform) if platform else None
+        if not profile:
+            return None
+        return profile['seconds_per_post'] * max(1, n_posts)
+
+    def _record_run_duration(self, platform: Optional[str], n_posts: int, duration: float) -> None:
+        """
+        Actualiza el perfil de duración de la plataforma con un run exitoso
+        (media móvil exponencial de los segundos por post).
+        """
+        if not platform:
+            return
+        seconds_per_post = duration / max(1, n_posts)
+        alpha = float(self.settings.get('run_profile_smoothing', 0.3))
+        with self._stats_lock:
+            profile = self.run_profiles.get(platform)
+            if profile:
+                profile['seconds_per_post'] = (
+                    alpha * seconds_per_post + (1 - alpha) * profile['seconds_per_post']
+                )
+                profile['samples'] += 1
+            else:
+                self.run_profiles[platform] = {
+                    'seconds_per_post': seconds_per_post, 
+                    'samples': 1
+                }
+
+    def _run_status_duration(self, run_status: dict) -> Optional[float]:
+        """
+        Duración (segundos) de un run según Apify (startedAt -> finishedAt),
+        o None si el status no trae ambas fechas.
+        """
+        started = pd.to_datetime(run_status.get('startedAt'), errors='coerce', utc=True)
+        finished = pd.to_datetime(run_status.get('finishedAt'), errors='coerce', utc=True)
+        if pd.isna(started) or pd.isna(finished):
+            return None
+        return (finished - started).total_seconds()
+
+    def _record_finished_run(
+        self, 
+        run_status: dict, 
+        platform: Optional[str], 
+        n_posts: int, 
+        waited: float, 
+        resumed: bool
+    ) -> None:
+        """
+        Registra la duración de un run exitoso en el perfil de la plataforma.
+        
+        En un run retomado de pending_runs el tiempo esperado solo cubre la
+        parte final del run, así que se usa la duración que informa Apify
+        (y si no la hay, el run no se registra).
+        """
+        if not resumed:
+            self._record_run_duration(platform, n_posts, waited)
+            return
+        duration = self._run_status_duration(run_status)
+        if duration is not None:
+            self._record_run_duration(platform, n_posts, duration)
+
+    def _poll_delays(self, platform: Optional[str] = None, n_posts: int = 1) -> Iterator[float]:
+        """
+        Genera los intervalos de espera entre consultas del estado de un run.
+        
+        Empieza con poll_interval_initial y crece exponencialmente
+        (poll_backoff_factor) hasta poll_interval_max, con un jitter
+        aleatorio de ±poll_jitter. Si hay un perfil de duración para la
+        plataforma, la primera espera salta directamente a una fracción de
+        la duración esperada.
+        """
+        interval = float(self.settings.get('poll_interval_initial', 2))
+        max_interval = float(self.settings.get('poll_interval_max', 30))
+        factor = float(self.settings.get('poll_backoff_factor', 1.5))
+        jitter = float(self.settings.get('poll_jitter', 0.2))
+        
+        expected = self._expected_run_duration(platform, n_posts)
+        if expected:
+            yield max(interval, 0.7 * expected)
+        
+        while True:
+            yield interval * random.uniform(1 - jitter, 1 + jitter)
+            interval = min(max_interval, interval * factor)
+
+    def _run_wait_timeout(self, platform: Optional[str], n_posts: int = 1) -> float:
+        """Tiempo máximo de espera de un run (base o 3x la duración esperada)"""
+        timeout = float(self.settings.get('run_wait_timeout', 300))
+        expected = self._expected_run_duration(platform, n_posts)
+        return max(timeout, 3 * expected) if expected else timeout
+
+    def _wait_for_run_finish(
+        self, 
+        run: dict, 
+        platform: Optional[str] = None, 
+        n_posts: int = 1, 
+        resumed: bool = False
+    ) -> Optional[dict]:
         """
-        Espera a que termine la ejecución del scraper de Apify.
+        Espera a que termine la ejecución del scraper de Apify, consultando
+        su estado con intervalos adaptativos (ver _poll_delays).
         
         Args:
             run: Objeto de run de Apify
+            platform: Plataforma del run (para el perfil de duración)
+            n_posts: Número de posts del run
+            resumed: True si el run se retoma de un intento anterior
             
         Returns:
             dict: Status del run o None si timeout
         """
         logger.info("Scraper initiated, waiting for results...")
-        max_wait_time = 300  # 5 minutos
+        max_wait_time = self._run_wait_timeout(platform, n_posts)
         start_time = time.time()
         
-        while True:
+        for delay in self._poll_delays(platform, n_posts):
             run_status = self.client.run(run["id"]).get()
             
-            if run_status["status"] in ["SUCCEEDED", "FAILED", "TIMED-OUT"]:
+            if run_status["status"] in RUN_TERMINAL_STATUSES:
+                if run_status["status"] == "SUCCEEDED":
+                    self._record_finished_run(
+                        run_status, platform, n_posts, time.time() - start_time, resumed
+                    )
                 return run_status
             
-            if time.time() - start_time > max_wait_time:
-                logger.error("Timeout reached while waiting for scraper.")
+            elapsed = time.time() - start_time
+            if elapsed > max_wait_time:
+                logger.error(
+                    f"Timeout reached while waiting for scraper "
+                    f"({elapsed:.0f}s, run {run['id']} still {run_status['status']})."
+                )
                 return None
             
-            time.sleep(10)
+            time.sleep(min(delay, max(0.0, max_wait_time - elapsed) + 1))
 
-    def _deduplicate_items(self, items: List[dict], platform: str) -> List[dict]:
+    def _run_actor(self, platform: str, urls: List[str], run_input: dict) -> Optional[dict]:
         """
-        Elimina duplicados de los items devueltos por Apify.
-    
-        Args:
-        items: Lista de items de Apify
-        platform: Nombre de la plataforma
+        Lanza el actor de la plataforma y espera a que termine. Si un intento
+        anterior con las mismas URLs agotó el tiempo de espera, retoma ese
+        run en lugar de lanzar uno nuevo.
+        
+        Returns:
+            dict: Status final del run o None si sigue en curso (timeout)
+        """
+        key = (platform, tuple(urls))
+        with self._stats_lock:
+            run = self.pending_runs.pop(key, None)
+        
+        resumed = run is not None
+        if resumed:
+            logger.info(f"Resuming wait on {platform} run {run['id']} from a previous attempt")
+        else:
+            run = self.client.actor(APIFY_ACTORS[platform]).start(run_input=run_input)
         
+        run_status = self._wait_for_run_finish(run, platform, len(urls), resumed)
+        if run_status is None:
+            with self._stats_lock:
+                self.pending_runs[key] = run
+        return run_status
+
+    def _item_hash(self, item: dict, platform: str) -> str:
+        """
+        Calcula el hash de deduplicación de un item de Apify.
+        
+        Args:
+            item: Item de Apify
+            platform: Nombre de la plataforma
+            
         Returns:
-        List[dict]: Items únicos
+            str: Hash MD5 basado en los campos únicos de la plataforma
         """
-        if not items:
-            return items
+        # Crear hash basado en campos únicos según plataforma
+        if platform == 'Facebook':
+            # Para Facebook: usar text + date
+            text = str(item.get('text', ''))
+            date = str(item.get('date', item.get('createdTime', '')))
+            unique_key = f"{text}|{date}"
     
-        seen_hashes = set()
-        unique_items = []
-        duplicates_found = 0
+        elif platform == 'Instagram':
+            # Para Instagram: usar text + timestamp
+            text = str(item.get('text', ''))
+            timestamp = str(item.get('timestamp', item.get('createdTime', '')))
+            unique_key = f"{text}|{timestamp}"
     
-        for item in items:
-            # Crear hash basado en campos únicos según plataforma
-            if platform == 'Facebook':
-                # Para Facebook: usar text + date
+        elif platform == 'TikTok':
+            # Para TikTok: usar cid (comment id) si existe, sino text + createTime
+            cid = item.get('cid')
+            if cid:
+                unique_key = f"cid_{cid}"
+            else:
                 text = str(item.get('text', ''))
-                date = str(item.get('date', item.get('createdTime', '')))
-                unique_key = f"{text}|{date}"
+                create_time = str(item.get('createTime', ''))
+                unique_key = f"{text}|{create_time}"
+    
+        else:
+            # Fallback genérico
+            text = str(item.get('text', ''))
+            unique_key = text
+    
+        # Crear hash MD5 del unique_key
+        return hashlib.md5(unique_key.encode('utf-8')).hexdigest()
+
+    def _iter_unique_items(
+        self, 
+        items: Iterable[dict], 
+        platform: str, 
+        seen_hashes: set, 
+        counters: Dict[str, int]
+    ) -> Iterator[dict]:
+        """
+        Generador que filtra los items duplicados a medida que llegan.
         
-            elif platform == 'Instagram':
-                # Para Instagram: usar text + timestamp
-                text = str(item.get('text', ''))
-                timestamp = str(item.get('timestamp', item.get('createdTime', '')))
-                unique_key = f"{text}|{timestamp}"
-        
-            elif platform == 'TikTok':
-                # Para TikTok: usar cid (comment id) si existe, sino text + createTime
-                cid = item.get('cid')
-                if cid:
-                    unique_key = f"cid_{cid}"
-                else:
-                    text = str(item.get('text', ''))
-                    create_time = str(item.get('createTime', ''))
-                    unique_key = f"{text}|{create_time}"
+        Args:
+            items: Items de Apify (lista o generador)
+            platform: Nombre de la plataforma
+            seen_hashes: Hashes ya vistos (se comparte entre páginas)
+            counters: Contadores 'items' y 'duplicates' (se actualizan)
+            
+        Yields:
+            dict: Items no vistos antes
+        """
+        for item in items:
+            counters['items'] = counters.get('items', 0) + 1
+            item_hash = self._item_hash(item, platform)
+            if item_hash in seen_hashes:
+                counters['duplicates'] = counters.get('duplicates', 0) + 1
+                continue
+            seen_hashes.add(item_hash)
+            yield item
+
+    def _item_epoch(self, item: dict, platform: str) -> Optional[int]:
+        """
+        Devuelve la fecha de un item de Apify como Unix epoch (o None).
         
-            else:
-                # Fallback genérico
-                text = str(item.get('text', ''))
-                unique_key = text
+        Los items de Instagram que agrupan varios comentarios ('comments')
+        no tienen una fecha de comentario propia y devuelven None.
+        """
+        if platform == 'Instagram' and item.get('comments') is not None:
+            return None
+        for field in COMMENT_DATE_FIELDS.get(platform, []):
+            if field in item and item[field]:
+                normalized = normalize_timestamp_for_hash(item[field])
+                return int(normalized) if normalized.isdigit() else None
+        return None
+
+    def max_comments_for(self, url: str, max_comments: int) -> int:
+        """
+        Límite de comentarios a pedir para una URL. En modo incremental, los
+        posts que ya tienen marca de agua solo necesitan el delta reciente,
+        siempre que el actor los devuelva del más reciente al más antiguo.
+        """
+        if url in self.watermarks and self.detect_platform(url) in NEWEST_FIRST_RUN_INPUT:
+            incremental_max = self.settings.get('incremental_max_comments_per_post')
+            if incremental_max:
+                return min(max_comments, int(incremental_max))
+        return max_comments
+
+    def _iter_new_items(
+        self, 
+        items: Iterable[dict], 
+        platform: str, 
+        url: str, 
+        counters: Dict[str, int]
+    ) -> Iterator[dict]:
+        """
+        Generador que descarta los comentarios anteriores a la marca de agua
+        del post y deja de consumir items tras una racha de comentarios ya
+        conocidos (incremental_known_streak).
         
-            # Crear hash MD5 del unique_key
-            item_hash = hashlib.md5(unique_key.encode('utf-8')).hexdigest()
+        Solo se aplica a las plataformas de NEWEST_FIRST_RUN_INPUT, cuyos
+        items llegan del más reciente al más antiguo; en las demás un
+        comentario nuevo puede venir detrás de otros antiguos y los items
+        pasan sin filtrar (ver _drop_known_comments).
         
-            if item_hash not in seen_hashes:
-                seen_hashes.add(item_hash)
-                unique_items.append(item)
-            else:
-                duplicates_found += 1
-    
-        if duplicates_found > 0:
-            logger.warning(f"⚠️  Removed {duplicates_found} duplicate items from Apify response")
-    
-        return unique_items
+        Como el pipeline es perezoso, cortar aquí detiene también la
+        descarga de páginas del dataset. La racha se guarda en counters
+        ('streak', 'stopped'), así que continúa entre páginas.
+        
+        Args:
+            items: Items de Apify (generador)
+            platform: Nombre de la plataforma
+            url: URL del post (clave de la marca de agua)
+            counters: Contadores (se actualizan 'known', 'streak' y 'stopped')
+            
+        Yields:
+            dict: Items más recientes que la marca de agua (o sin fecha)
+        """
+        watermark = self.watermarks.get(url, {}).get('latest_created_time')
+        if watermark is None or platform not in NEWEST_FIRST_RUN_INPUT:
+            yield from items
+            return
+        if counters.get('stopped'):
+            return
+        
+        max_streak = int(self.settings.get('incremental_known_streak', 50))
+        for item in items:
+            epoch = self._item_epoch(item, platform)
+            if epoch is not None and epoch < watermark:
+                counters['known'] = counters.get('known', 0) + 1
+                counters['streak'] = counters.get('streak', 0) + 1
+                if max_streak and counters['streak'] >= max_streak:
+                    logger.info(
+                        f"Reached {counters['streak']} already-known comments in a row; "
+                        f"stopping download for {url}"
+                    )
+                    counters['stopped'] = True
+                    return
+                continue
+            counters['streak'] = 0
+            yield item
+
+    def _drop_known_comments(
+        self, 
+        comments: List[dict], 
+        platform: str, 
+        url: str, 
+        counters: Dict[str, int]
+    ) -> List[dict]:
+        """
+        Descarta los comentarios procesados que ya están guardados (mismo
+        _comment_hash) en los posts con marca de agua de las plataformas
+        que no garantizan el orden del más reciente al más antiguo.
+        
+        Args:
+            comments: Comentarios procesados
+            platform: Nombre de la plataforma
+            url: URL del post
+            counters: Contadores (se actualiza 'known')
+            
+        Returns:
+            List[dict]: Comentarios que no estaban guardados
+        """
+        if not comments or url not in self.watermarks or platform in NEWEST_FIRST_RUN_INPUT:
+            return comments
+        new_comments = [
+            comment for comment in comments 
+            if create_unique_comment_hash(comment) not in self.known_comment_hashes
+        ]
+        counters['known'] = counters.get('known', 0) + len(comments) - len(new_comments)
+        return new_comments
+
+    def _iter_dataset_pages(self, dataset_id: str, limit: int) -> Iterator[List[dict]]:
+        """
+        Descarga un dataset de Apify página a página.
+        
+        Cada página se pide con list_items(offset, limit=dataset_page_size),
+        así que solo hay una página de items crudos en memoria a la vez.
+        
+        Args:
+            dataset_id: ID del dataset del run
+            limit: Número máximo de items a descargar en total
+            
+        Yields:
+            List[dict]: Items de cada página
+        """
+        page_size = max(1, int(self.settings.get('dataset_page_size', 1000)))
+        dataset = self.client.dataset(dataset_id)
+        offset = 0
+        
+        while offset < limit:
+            requested = min(page_size, limit - offset)
+            page = dataset.list_items(clean=True, offset=offset, limit=requested).items
+            if not page:
+                break
+            yield page
+            offset += len(page)
+            if len(page) < requested:
+                break
+
+    def _collect_comments(
+        self, 
+        pages: Iterable[List[dict]], 
+        platform: str, 
+        url: str, 
+        post_number: int, 
+        campaign_info: dict
+    ) -> List[dict]:
+        """
+        Procesa las páginas de un dataset como un pipeline de generadores:
+        páginas -> items -> items únicos -> comentarios procesados.
+        
+        Los items crudos de Apify se descartan en cuanto se procesan, de modo
+        que el pico de memoria queda acotado por el tamaño de página.
+        
+        Returns:
+            List[dict]: Comentarios procesados
+        """
+        counters = {'items': 0, 'duplicates': 0, 'known': 0}
+        unique_items = self._iter_unique_items(
+            (item for page in pages for item in page), 
+            platform, set(), counters
+        )
+        new_items = self._iter_new_items(unique_items, platform, url, counters)
+        processed = self._drop_known_comments(
+            self._process_results(platform, new_items, url, post_number, campaign_info), 
+            platform, url, counters
+        )
+        
+        logger.info(f"Extraction complete: {counters['items']} items found.")
+        if counters['duplicates'] > 0:
+            logger.warning(
+                f"⚠️  Removed {counters['duplicates']} duplicate items from Apify response"
+            )
+        if counters['known'] > 0:
+            logger.info(f"Skipped {counters['known']} comments already extracted in previous runs")
+            self._increment_stat('known_comments_skipped', counters['known'])
+            if not processed:
+                with self._stats_lock:
+                    self.up_to_date_urls.add(url)
+        return processed
 
     def scrape_with_retry(
         self, 
@@ -319,7 +787,7 @@ class SocialMediaScraper:
             List[dict]: Lista de comentarios extraídos
         """
         max_retries = self.settings.get('max_retries', 3)
-        self.extraction_stats['total_attempts'] += 1
+        self._increment_stat('total_attempts')
         
         for attempt in range(max_retries):
             try:
@@ -327,20 +795,17 @@ class SocialMediaScraper:
                 
                 if result:
                     # Validar comentarios extraídos
-                    valid_comments = []
-                    for comment in result:
-                        is_valid, error_msg = validate_comment_data(comment)
-                        if is_valid:
-                            valid_comments.append(comment)
-                        else:
-                            logger.warning(f"Invalid comment data: {error_msg}")
-                            self.extraction_stats['invalid_comments'] += 1
+                    valid_comments = self._validate_comments(result)
                     
                     if valid_comments:
-                        self.extraction_stats['successful'] += 1
+                        self._increment_stat('successful')
                         return valid_comments
                     else:
                         logger.warning(f"All comments from {url} failed validation")
+                elif url in self.up_to_date_urls:
+                    # Modo incremental: no hay comentarios nuevos, no es un fallo
+                    self._increment_stat('successful')
+                    return []
                 
                 if attempt < max_retries - 1:
                     wait_time = (attempt + 1) * 30
@@ -357,8 +822,9 @@ class SocialMediaScraper:
                     time.sleep(wait_time)
         
         # Si llegamos aquí, todos los intentos fallaron
-        self.failed_urls.append(url)
-        self.extraction_stats['failed'] += 1
+        with self._stats_lock:
+            self.failed_urls.append(url)
+            self.extraction_stats['failed'] += 1
         logger.error(f"All {max_retries} attempts failed for URL: {url}")
         return []
 
@@ -373,34 +839,18 @@ class SocialMediaScraper:
         try:
             logger.info(f"Processing Facebook Post {post_number}: {url}")
         
-            run_input = {
-                "startUrls": [{"url": self.clean_url(url)}], 
-                "maxComments": max_comments
-            }
+            run_input = self._build_run_input('Facebook', [url], max_comments)
         
-            run = self.client.actor("apify/facebook-comments-scraper").call(
-                run_input=run_input
-            )
-            run_status = self._wait_for_run_finish(run)
+            run_status = self._run_actor('Facebook', [url], run_input)
         
             if not run_status or run_status["status"] != "SUCCEEDED":
-                logger.error(
-                    f"Facebook extraction failed. Status: {run_status.get('status', 'UNKNOWN')}"
-                )
+                status = run_status["status"] if run_status else 'TIMEOUT'
+                logger.error(f"Facebook extraction failed. Status: {status}")
                 return []
         
-            # Obtener items de Apify
-            dataset = self.client.dataset(run["defaultDatasetId"])
-            items_response = dataset.list_items(clean=True, limit=max_comments)
-            items = items_response.items
-        
-            logger.info(f"Extraction complete: {len(items)} items found.")
-        
-            # ✅ NUEVO: DEDUPLICACIÓN MANUAL POST-EXTRACCIÓN
-            items = self._deduplicate_items(items, platform='Facebook')
-            logger.info(f"After deduplication: {len(items)} unique items.")
-        
-            return self._process_facebook_results(items, url, post_number, campaign_info)
+            # Descargar items de Apify por páginas, deduplicar y procesar
+            pages = self._iter_dataset_pages(run_status["defaultDatasetId"], max_comments)
+            return self._collect_comments(pages, 'Facebook', url, post_number, campaign_info)
         
         except Exception as e:
             logger.error(f"Error in scrape_facebook_comments: {e}")
@@ -417,33 +867,18 @@ class SocialMediaScraper:
         try:
             logger.info(f"Processing Instagram Post {post_number}: {url}")
         
-            run_input = {
-                "directUrls": [url], 
-                "resultsType": "comments", 
-                "resultsLimit": max_comments
-            }
+            run_input = self._build_run_input('Instagram', [url], max_comments)
         
-            run = self.client.actor("apify/instagram-scraper").call(run_input=run_input)
-            run_status = self._wait_for_run_finish(run)
+            run_status = self._run_actor('Instagram', [url], run_input)
         
             if not run_status or run_status["status"] != "SUCCEEDED":
-                logger.error(
-                    f"Instagram extraction failed. Status: {run_status.get('status', 'UNKNOWN')}"
-                )
+                status = run_status["status"] if run_status else 'TIMEOUT'
+                logger.error(f"Instagram extraction failed. Status: {status}")
                 return []
         
-            # Obtener items de Apify
-            dataset = self.client.dataset(run["defaultDatasetId"])
-            items_response = dataset.list_items(clean=True, limit=max_comments)
-            items = items_response.items
-        
-            logger.info(f"Extraction complete: {len(items)} items found.")
-        
-            # ✅ NUEVO: DEDUPLICACIÓN MANUAL POST-EXTRACCIÓN
-            items = self._deduplicate_items(items, platform='Instagram')
-            logger.info(f"After deduplication: {len(items)} unique items.")
-        
-            return self._process_instagram_results(items, url, post_number, campaign_info)
+            # Descargar items de Apify por páginas, deduplicar y procesar
+            pages = self._iter_dataset_pages(run_status["defaultDatasetId"], max_comments)
+            return self._collect_comments(pages, 'Instagram', url, post_number, campaign_info)
         
         except Exception as e:
             logger.error(f"Error in scrape_instagram_comments: {e}")
@@ -460,34 +895,18 @@ class SocialMediaScraper:
         try:
             logger.info(f"Processing TikTok Post {post_number}: {url}")
         
-            run_input = {
-                "postURLs": [self.clean_url(url)], 
-                "maxCommentsPerPost": max_comments
-            }
+            run_input = self._build_run_input('TikTok', [url], max_comments)
         
-            run = self.client.actor("clockworks/tiktok-comments-scraper").call(
-                run_input=run_input
-            )
-            run_status = self._wait_for_run_finish(run)
+            run_status = self._run_actor('TikTok', [url], run_input)
         
             if not run_status or run_status["status"] != "SUCCEEDED":
-                logger.error(
-                    f"TikTok extraction failed. Status: {run_status.get('status', 'UNKNOWN')}"
-                )
+                status = run_status["status"] if run_status else 'TIMEOUT'
+                logger.error(f"TikTok extraction failed. Status: {status}")
                 return []
         
-            # Obtener items de Apify
-            dataset = self.client.dataset(run["defaultDatasetId"])
-            items_response = dataset.list_items(clean=True, limit=max_comments)
-            items = items_response.items
-        
-            logger.info(f"Extraction complete: {len(items)} comments found.")
-        
-            # ✅ NUEVO: DEDUPLICACIÓN MANUAL POST-EXTRACCIÓN
-            items = self._deduplicate_items(items, platform='TikTok')
-            logger.info(f"After deduplication: {len(items)} unique items.")
-        
-            return self._process_tiktok_results(items, url, post_number, campaign_info)
+            # Descargar items de Apify por páginas, deduplicar y procesar
+            pages = self._iter_dataset_pages(run_status["defaultDatasetId"], max_comments)
+            return self._collect_comments(pages, 'TikTok', url, post_number, campaign_info)
         
         except Exception as e:
             logger.error(f"Error in scrape_tiktok_comments: {e}")
@@ -495,17 +914,14 @@ class SocialMediaScraper:
 
     def _process_facebook_results(
         self, 
-        items: List[dict], 
+        items: Iterable[dict], 
         url: str, 
         post_number: int, 
         campaign_info: dict
     ) -> List[dict]:
         """Procesa los resultados extraídos de Facebook"""
         processed = []
-        possible_date_fields = [
-            'createdTime', 'timestamp', 'publishedTime', 
-            'date', 'createdAt', 'publishedAt'
-        ]
+        possible_date_fields = COMMENT_DATE_FIELDS['Facebook']
         
         for comment in items:
             created_time = None
@@ -537,17 +953,14 @@ class SocialMediaScraper:
 
     def _process_instagram_results(
         self, 
-        items: List[dict], 
+        items: Iterable[dict], 
         url: str, 
         post_number: int, 
         campaign_info: dict
     ) -> List[dict]:
         """Procesa los resultados extraídos de Instagram"""
         processed = []
-        possible_date_fields = [
-            'timestamp', 'createdTime', 'publishedAt', 
-            'date', 'createdAt', 'taken_at'
-        ]
+        possible_date_fields = COMMENT_DATE_FIELDS['Instagram']
         
         for item in items:
             comments_list = (
@@ -587,7 +1000,7 @@ class SocialMediaScraper:
 
     def _process_tiktok_results(
         self, 
-        items: List[dict], 
+        items: Iterable[dict], 
         url: str, 
         post_number: int, 
         campaign_info: dict
@@ -620,43 +1033,446 @@ class SocialMediaScraper:
         logger.info(f"Processed {len(processed)} TikTok comments.")
         return processed
 
+    def _normalize_url_key(self, url: str) -> str:
+        """Normaliza una URL para comparar la URL de entrada con la de los items"""
+        key = self.clean_url(str(url)).strip().lower().rstrip('/')
+        for prefix in ('https://', 'http://', 'www.', 'm.'):
+            if key.startswith(prefix):
+                key = key[len(prefix):]
+        return key
+
+    def _item_source_url(self, item: dict, url_keys: Dict[str, str]) -> Optional[str]:
+        """
+        Identifica de qué URL de entrada proviene un item de un run por lotes.
+        
+        Args:
+            item: Item del dataset de Apify
+            url_keys: Mapa de URL normalizada -> URL original del lote
+            
+        Returns:
+            str: URL original del lote o None si no se pudo identificar
+        """
+        for field in BATCH_SOURCE_URL_FIELDS:
+            value = item.get(field)
+            if isinstance(value, dict):
+                value = value.get('url')
+            if value:
+                key = self._normalize_url_key(value)
+                if key in url_keys:
+                    return url_keys[key]
+        return None
+
+    def scrape_platform_batch(
+        self, 
+        platform: str, 
+        posts: List[Tuple[str, int]], 
+        max_comments: int = 500, 
+        campaign_info: dict = None
+    ) -> Dict[str, List[dict]]:
+        """
+        Extrae los comentarios de varias publicaciones de una plataforma
+        con un único run del actor y los reparte por URL de origen.
+        
+        Args:
+            platform: Nombre de la plataforma (normalizado)
+            posts: Lista de (url, post_number) del lote
+            max_comments: Número máximo de comentarios por post
+            campaign_info: Información de campaña
+            
+        Returns:
+            Dict[str, List[dict]]: Comentarios procesados por URL
+        """
+        urls = [url for url, _ in posts]
+        logger.info(f"Processing {platform} batch of {len(urls)} posts")
+        
+        limits = {url: self.max_comments_for(url, max_comments) for url in urls}
+        run_input = self._build_run_input(platform, urls, max(limits.values()))
+        run_status = self._run_actor(platform, urls, run_input)
+        
+        if not run_status or run_status["status"] != "SUCCEEDED":
+            status = run_status["status"] if run_status else 'TIMEOUT'
+            raise RuntimeError(f"{platform} batch extraction failed. Status: {status}")
+        
+        # Repartir los items de cada página por la URL de entrada que los
+        # originó y procesarlos antes de pedir la página siguiente. El estado
+        # de cada URL (hashes vistos, racha de conocidos, items aceptados)
+        # se conserva entre páginas
+        url_keys = {self._normalize_url_key(url): url for url in urls}
+        post_numbers = dict(posts)
+        results = {url: [] for url in urls}
+        seen_by_url = {url: set() for url in urls}
+        counters_by_url = {
+            url: {'items': 0, 'duplicates': 0, 'known': 0, 'accepted': 0} for url in urls
+        }
+        
+        def is_done(url: str) -> bool:
+            counters = counters_by_url[url]
+            return bool(counters.get('stopped')) or counters['accepted'] >= limits[url]
+        total_items = 0
+        unmatched = 0
+        
+        pages = self._iter_dataset_pages(run_status["defaultDatasetId"], max_comments * len(urls))
+        for page in pages:
+            total_items += len(page)
+            page_by_url = {}
+            for item in page:
+                source_url = self._item_source_url(item, url_keys)
+                if source_url is None and len(urls) == 1:
+                    source_url = urls[0]
+                if source_url is None:
+                    unmatched += 1
+                    continue
+                page_by_url.setdefault(source_url, []).append(item)
+            
+            for url, page_items in page_by_url.items():
+                if is_done(url):
+                    continue
+                counters = counters_by_url[url]
+                unique_items = self._iter_unique_items(
+                    page_items, platform, seen_by_url[url], counters
+                )
+                unique_items = self._iter_new_items(unique_items, platform, url, counters)
+                # Respetar el límite de la URL (max_comments_for) en todo el run
+                new_items = list(itertools.islice(
+                    unique_items, limits[url] - counters['accepted']
+                ))
+                counters['accepted'] += len(new_items)
+                results[url].extend(self._drop_known_comments(
+                    self._process_results(
+                        platform, new_items, url, post_numbers[url], campaign_info
+                    ), 
+                    platform, url, counters
+                ))
+            
+            # Todas las URLs completas o con su racha de conocidos: no hace
+            # falta descargar más páginas
+            if all(is_done(url) for url in urls):
+                break
+        
+        logger.info(f"Batch extraction complete: {total_items} items found.")
+        known = sum(counters['known'] for counters in counters_by_url.values())
+        if known:
+            logger.info(f"Skipped {known} comments already extracted in previous runs")
+            self._increment_stat('known_comments_skipped', known)
+            with self._stats_lock:
+                self.up_to_date_urls.update(
+                    url for url in urls 
+                    if counters_by_url[url]['known'] and not results[url]
+                )
+        if unmatched:
+            logger.warning(
+                f"⚠️  {unmatched} {platform} items could not be matched to a post URL"
+            )
+        return results
+
+    def scrape_batch_with_retry(
+        self, 
+        platform: str, 
+        posts: List[Tuple[str, int]], 
+        max_comments: int, 
+        campaign_info: dict
+    ) -> Dict[str, List[dict]]:
+        """
+        Ejecuta scrape_platform_batch con reintentos automáticos.
+        
+        Los comentarios de cada URL se validan igual que en scrape_with_retry.
+        Si todos los intentos fallan, todas las URLs del lote se marcan como
+        fallidas.
+        
+        Returns:
+            Dict[str, List[dict]]: Comentarios válidos por URL
+        """
+        max_retries = self.settings.get('max_retries', 3)
+        self._increment_stat('total_attempts', len(posts))
+        
+        for attempt in range(max_retries):
+            try:
+                batch_results = self.scrape_platform_batch(
+                    platform, posts, max_comments, campaign_info
+                )
+                results = {}
+                for url, comments in batch_results.items():
+                    results[url] = self._validate_comments(comments)
+                    if results[url]:
+                        self._increment_stat('successful')
+                return results
+            except Exception as e:
+                logger.error(
+                    f"Batch attempt {attempt + 1}/{max_retries} for {platform} "
+                    f"failed with error: {e}"
+                )
+                if attempt < max_retries - 1:
+                    wait_time = (attempt + 1) * 30
+                    time.sleep(wait_time)
+        
+        with self._stats_lock:
+            for url, _ in posts:
+                self.failed_urls.append(url)
+            self.extraction_stats['failed'] += len(posts)
+        logger.error(f"All {max_retries} attempts failed for {platform} batch")
+        return {url: [] for url, _ in posts}
+
     def get_stats_summary(self) -> dict:
         """Retorna resumen de estadísticas de extracción"""
-        return self.extraction_stats.copy()
-
+        with self._stats_lock:
+            return self.extraction_stats.copy()
 
-# ============================================================================
-# FUNCIONES DE PROCESAMIENTO DE DATOS
-# ============================================================================
 
-def create_post_registry_entry(
-    url: str, 
-    platform: str, 
-    campaign_info: dict, 
-    post_number: int
-) -> dict:
+class AsyncSocialMediaScraper(SocialMediaScraper):
     """
-    Crea una entrada de registro para una pauta procesada sin comentarios.
+    Variante asíncrona de SocialMediaScraper basada en ApifyClientAsync.
     
-    Args:
-        url: URL de la publicación
-        platform: Nombre de la plataforma (normalizado)
-        campaign_info: Información de campaña
-        post_number: Número de post
-        
-    Returns:
-        dict: Entrada de registro
+    El arranque de actores, el sondeo del estado de cada run y la descarga
+    del dataset se hacen con await, de modo que un único event loop puede
+    seguir decenas de runs de Apify a la vez sin bloquear un hilo por URL.
+    Los métodos scrape_* y scrape_with_retry tienen la misma firma que en
+    la clase síncrona, pero son corrutinas.
     """
-    return {
-        **campaign_info,
-        'post_url': url,
-        'post_url_original': url,
-        'post_number': post_number,
-        'platform': platform,
-        'author_name': None,
-        'author_url': None,
-        'comment_text': None,
-        'created_time': None,
+    
+    def __init__(self, apify_token: str, settings: dict):
+        super().__init__(apify_token, settings)
+        self.client = ApifyClientAsync(apify_token)
+
+    async def _wait_for_run_finish(
+        self, 
+        run: dict, 
+        platform: Optional[str] = None, 
+        n_posts: int = 1, 
+        resumed: bool = False
+    ) -> Optional[dict]:
+        """
+        Espera (sin bloquear el event loop) a que termine un run de Apify,
+        con los mismos intervalos adaptativos que la versión síncrona.
+        
+        Args:
+            run: Objeto de run de Apify
+            platform: Plataforma del run (para el perfil de duración)
+            n_posts: Número de posts del run
+            resumed: True si el run se retoma de un intento anterior
+            
+        Returns:
+            dict: Status del run o None si timeout
+        """
+        logger.info("Scraper initiated, waiting for results...")
+        max_wait_time = self._run_wait_timeout(platform, n_posts)
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        
+        for delay in self._poll_delays(platform, n_posts):
+            run_status = await self.client.run(run["id"]).get()
+            
+            if run_status["status"] in RUN_TERMINAL_STATUSES:
+                if run_status["status"] == "SUCCEEDED":
+                    self._record_finished_run(
+                        run_status, platform, n_posts, loop.time() - start_time, resumed
+                    )
+                return run_status
+            
+            elapsed = loop.time() - start_time
+            if elapsed > max_wait_time:
+                logger.error(
+                    f"Timeout reached while waiting for scraper "
+                    f"({elapsed:.0f}s, run {run['id']} still {run_status['status']})."
+                )
+                return None
+            
+            await asyncio.sleep(min(delay, max(0.0, max_wait_time - elapsed) + 1))
+
+    async def _run_actor(self, platform: str, urls: List[str], run_input: dict) -> Optional[dict]:
+        """Versión asíncrona de SocialMediaScraper._run_actor"""
+        key = (platform, tuple(urls))
+        run = self.pending_runs.pop(key, None)
+        
+        resumed = run is not None
+        if resumed:
+            logger.info(f"Resuming wait on {platform} run {run['id']} from a previous attempt")
+        else:
+            run = await self.client.actor(APIFY_ACTORS[platform]).start(run_input=run_input)
+        
+        run_status = await self._wait_for_run_finish(run, platform, len(urls), resumed)
+        if run_status is None:
+            self.pending_runs[key] = run
+        return run_status
+
+    async def _iter_dataset_pages(self, dataset_id: str, limit: int) -> AsyncIterator[List[dict]]:
+        """Versión asíncrona de SocialMediaScraper._iter_dataset_pages"""
+        page_size = max(1, int(self.settings.get('dataset_page_size', 1000)))
+        dataset = self.client.dataset(dataset_id)
+        offset = 0
+        
+        while offset < limit:
+            requested = min(page_size, limit - offset)
+            page = (await dataset.list_items(clean=True, offset=offset, limit=requested)).items
+            if not page:
+                break
+            yield page
+            offset += len(page)
+            if len(page) < requested:
+                break
+
+    async def scrape_with_retry(
+        self, 
+        scrape_function, 
+        url: str, 
+        max_comments: int, 
+        campaign_info: dict, 
+        post_number: int
+    ) -> List[dict]:
+        """Versión asíncrona de SocialMediaScraper.scrape_with_retry"""
+        max_retries = self.settings.get('max_retries', 3)
+        self._increment_stat('total_attempts')
+        
+        for attempt in range(max_retries):
+            try:
+                result = await scrape_function(url, max_comments, campaign_info, post_number)
+                
+                if result:
+                    valid_comments = self._validate_comments(result)
+                    
+                    if valid_comments:
+                        self._increment_stat('successful')
+                        return valid_comments
+                    else:
+                        logger.warning(f"All comments from {url} failed validation")
+                elif url in self.up_to_date_urls:
+                    # Modo incremental: no hay comentarios nuevos, no es un fallo
+                    self._increment_stat('successful')
+                    return []
+                
+                if attempt < max_retries - 1:
+                    wait_time = (attempt + 1) * 30
+                    logger.warning(
+                        f"Attempt {attempt + 1}/{max_retries} failed. "
+                        f"Waiting {wait_time} seconds before retry..."
+                    )
+                    await asyncio.sleep(wait_time)
+                    
+            except Exception as e:
+                logger.error(f"Attempt {attempt + 1}/{max_retries} failed with error: {e}")
+                if attempt < max_retries - 1:
+                    wait_time = (attempt + 1) * 30
+                    await asyncio.sleep(wait_time)
+        
+        with self._stats_lock:
+            self.failed_urls.append(url)
+            self.extraction_stats['failed'] += 1
+        logger.error(f"All {max_retries} attempts failed for URL: {url}")
+        return []
+
+    async def scrape_comments(
+        self, 
+        platform: str, 
+        url: str, 
+        max_comments: int = 500, 
+        campaign_info: dict = None, 
+        post_number: int = 1
+    ) -> List[dict]:
+        """
+        Extrae los comentarios de una publicación de cualquier plataforma.
+        
+        Args:
+            platform: Nombre de la plataforma (normalizado)
+            url: URL de la publicación
+            max_comments: Número máximo de comentarios
+            campaign_info: Información de campaña
+            post_number: Número de post
+            
+        Returns:
+            List[dict]: Comentarios procesados
+        """
+        try:
+            logger.info(f"Processing {platform} Post {post_number}: {url}")
+            
+            run_input = self._build_run_input(platform, [url], max_comments)
+            
+            # start() no espera al final del run; el sondeo lo hace
+            # _wait_for_run_finish cediendo el control al event loop
+            run_status = await self._run_actor(platform, [url], run_input)
+            
+            if not run_status or run_status["status"] != "SUCCEEDED":
+                status = run_status["status"] if run_status else 'TIMEOUT'
+                logger.error(f"{platform} extraction failed. Status: {status}")
+                return []
+            
+            # Mismo pipeline que la versión síncrona, página a página
+            counters = {'items': 0, 'duplicates': 0, 'known': 0}
+            seen_hashes = set()
+            processed = []
+            async for page in self._iter_dataset_pages(run_status["defaultDatasetId"], max_comments):
+                new_items = self._iter_new_items(
+                    self._iter_unique_items(page, platform, seen_hashes, counters),
+                    platform, url, counters
+                )
+                processed.extend(self._drop_known_comments(
+                    self._process_results(platform, new_items, url, post_number, campaign_info), 
+                    platform, url, counters
+                ))
+                # Racha de comentarios conocidos: el resto ya está guardado
+                if counters.get('stopped'):
+                    break
+            
+            logger.info(f"Extraction complete: {counters['items']} items found.")
+            if counters['duplicates'] > 0:
+                logger.warning(
+                    f"⚠️  Removed {counters['duplicates']} duplicate items from Apify response"
+                )
+            if counters['known'] > 0:
+                logger.info(f"Skipped {counters['known']} comments already extracted in previous runs")
+                self._increment_stat('known_comments_skipped', counters['known'])
+                if not processed:
+                    with self._stats_lock:
+                        self.up_to_date_urls.add(url)
+            return processed
+        
+        except Exception as e:
+            logger.error(f"Error in scrape_comments ({platform}): {e}")
+            raise
+
+    async def scrape_facebook_comments(self, url, max_comments=500, campaign_info=None, post_number=1):
+        """Extrae comentarios de Facebook"""
+        return await self.scrape_comments('Facebook', url, max_comments, campaign_info, post_number)
+
+    async def scrape_instagram_comments(self, url, max_comments=500, campaign_info=None, post_number=1):
+        """Extrae comentarios de Instagram"""
+        return await self.scrape_comments('Instagram', url, max_comments, campaign_info, post_number)
+
+    async def scrape_tiktok_comments(self, url, max_comments=500, campaign_info=None, post_number=1):
+        """Extrae comentarios de TikTok"""
+        return await self.scrape_comments('TikTok', url, max_comments, campaign_info, post_number)
+
+
+# ============================================================================
+# FUNCIONES DE PROCESAMIENTO DE DATOS
+# ============================================================================
+
+def create_post_registry_entry(
+    url: str, 
+    platform: str, 
+    campaign_info: dict, 
+    post_number: int
+) -> dict:
+    """
+    Crea una entrada de registro para una pauta procesada sin comentarios.
+    
+    Args:
+        url: URL de la publicación
+        platform: Nombre de la plataforma (normalizado)
+        campaign_info: Información de campaña
+        post_number: Número de post
+        
+    Returns:
+        dict: Entrada de registro
+    """
+    return {
+        **campaign_info,
+        'post_url': url,
+        'post_url_original': url,
+        'post_number': post_number,
+        'platform': platform,
+        'author_name': None,
+        'author_url': None,
+        'comment_text': None,
+        'created_time': None,
         'likes_count': 0,
         'replies_count': 0,
         'is_reply': False,
@@ -782,6 +1598,166 @@ def create_unique_comment_hash(row: pd.Series) -> str:
     return hashlib.md5(unique_string.encode('utf-8')).hexdigest()
 
 
+def normalize_timestamps_for_hash(values: pd.Series) -> List[str]:
+    """
+    Versión por columna de normalize_timestamp_for_hash.
+    
+    Los casos simples (vacíos, números, strings numéricos) se resuelven sin
+    parsear y las fechas en texto se parsean una sola vez por valor único y
+    en bloque (ISO 8601). Lo que no encaja en estos casos se delega a la
+    función escalar, por lo que el resultado es idéntico al de aplicarla
+    valor por valor.
+    
+    Args:
+        values: Serie con los timestamps originales (created_time)
+        
+    Returns:
+        List[str]: Timestamps normalizados, en el mismo orden que values
+    """
+    normalized: List[Optional[str]] = [None] * len(values)
+    date_strings: Dict[str, List[int]] = {}
+    fallback: List[int] = []
+    raw_values = values.tolist()
+    
+    for position, value in enumerate(raw_values):
+        if value is None or value is pd.NA or value is pd.NaT:
+            normalized[position] = 'UNKNOWN'
+        elif isinstance(value, str):
+            if value == '':
+                normalized[position] = 'UNKNOWN'
+            elif value.isdigit():
+                normalized[position] = value
+            else:
+                date_strings.setdefault(value, []).append(position)
+        elif isinstance(value, int):
+            normalized[position] = str(int(value))
+        elif isinstance(value, float):
+            if value != value:  # NaN
+                normalized[position] = 'UNKNOWN'
+            elif value in (float('inf'), float('-inf')):
+                fallback.append(position)
+            else:
+                normalized[position] = str(int(value))
+        else:
+            fallback.append(position)
+    
+    # Parsear en bloque los strings de fecha distintos
+    if date_strings:
+        unique_strings = list(date_strings)
+        parsed = pd.to_datetime(
+            pd.Series(unique_strings, dtype=object), 
+            errors='coerce', 
+            utc=True, 
+            format='ISO8601'
+        )
+        for text, timestamp in zip(unique_strings, parsed):
+            if pd.isna(timestamp):
+                # Formato no ISO: resolver con la función escalar
+                fallback.extend(date_strings[text])
+                continue
+            epoch = str(int(timestamp.timestamp()))
+            for position in date_strings[text]:
+                normalized[position] = epoch
+    
+    for position in fallback:
+        normalized[position] = normalize_timestamp_for_hash(raw_values[position])
+    
+    return normalized
+
+
+def create_comment_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    Versión vectorizada de create_unique_comment_hash para un DataFrame
+    completo. Genera exactamente los mismos hashes que aplicar la función
+    fila por fila, sin construir una Serie por fila.
+    
+    Args:
+        df: DataFrame con datos de comentarios
+        
+    Returns:
+        pd.Series: Hash de cada fila, con el mismo índice que df
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+    
+    row_count = len(df)
+    
+    def column_as_str(column: str, default: str) -> pd.Series:
+        # Equivalente a str(row.get(column, default)) para toda la columna
+        if column not in df.columns:
+            return pd.Series([default] * row_count, dtype=object)
+        return pd.Series([str(value) for value in df[column].tolist()], dtype=object)
+    
+    platform = column_as_str('platform', '').str.strip().str.lower()
+    post_url = column_as_str('post_url', '').str.strip()
+    comment_text = column_as_str('comment_text', '').str.strip()
+    
+    is_registry = comment_text == ''
+    if 'comment_text' in df.columns:
+        is_registry |= df['comment_text'].isna().reset_index(drop=True)
+    is_comment = ~is_registry
+    
+    hashes = pd.Series([None] * row_count, dtype=object)
+    
+    # Entradas de registro: hash de post_url y plataforma
+    if is_registry.any():
+        extraction_status = column_as_str('extraction_status', 'UNKNOWN')[is_registry]
+        url_hashes = pd.Series([
+            hashlib.md5(url.encode('utf-8')).hexdigest() 
+            for url in post_url[is_registry]
+        ], index=extraction_status.index, dtype=object)
+        hashes[is_registry] = (
+            'REGISTRY_' + platform[is_registry] + '_' + extraction_status + '_' + url_hashes
+        )
+    
+    # Comentarios reales: hash de plataforma, URL, texto y timestamp
+    if is_comment.any():
+        if 'created_time' in df.columns:
+            created_time = normalize_timestamps_for_hash(
+                df['created_time'].reset_index(drop=True)[is_comment]
+            )
+        else:
+            created_time = ['UNKNOWN'] * int(is_comment.sum())
+        unique_strings = (
+            platform[is_comment] + '|' + post_url[is_comment] + '|' + 
+            comment_text[is_comment] + '|' + 
+            pd.Series(created_time, index=platform[is_comment].index, dtype=object)
+        )
+        hashes[is_comment] = [
+            hashlib.md5(unique_string.encode('utf-8')).hexdigest() 
+            for unique_string in unique_strings
+        ]
+    
+    return hashes.set_axis(df.index)
+
+
+def ensure_comment_hashes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Asegura la columna _comment_hash, calculando el hash solo para las filas
+    que no lo tengan persistido (datos nuevos o archivos anteriores a la
+    columna).
+    
+    Args:
+        df: DataFrame con datos de comentarios
+        
+    Returns:
+        pd.DataFrame: DataFrame con la columna _comment_hash completa
+    """
+    if df.empty:
+        return df
+    
+    if '_comment_hash' not in df.columns:
+        df['_comment_hash'] = create_comment_hashes(df)
+        return df
+    
+    missing = df['_comment_hash'].isna()
+    if missing.any():
+        logger.info(f"Hashing {missing.sum()} rows without a stored hash")
+        df['_comment_hash'] = df['_comment_hash'].astype(object)
+        df.loc[missing, '_comment_hash'] = create_comment_hashes(df[missing])
+    return df
+
+
 def normalize_existing_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normaliza los datos existentes para asegurar consistencia.
@@ -839,25 +1815,21 @@ def merge_comments(
     Versión con DEBUGGING DETALLADO.
     """
     if df_existing.empty:
-        return df_new
+        return ensure_comment_hashes(df_new)
     if df_new.empty:
-        return df_existing
+        return ensure_comment_hashes(df_existing)
     
     logger.info(f"Merging: {len(df_existing)} existing + {len(df_new)} new rows")
     
     # Normalizar datos existentes antes de combinar
     df_existing = normalize_existing_data(df_existing)
     
-    # Crear hashes únicos para identificación
-    logger.info("Creating hashes for existing data...")
-    df_existing['_comment_hash'] = df_existing.apply(
-        create_unique_comment_hash, axis=1
-    )
+    # Los hashes de los datos existentes vienen persistidos en el Excel
+    # (_comment_hash); solo se calculan los que falten y los de datos nuevos
+    df_existing = ensure_comment_hashes(df_existing)
     
     logger.info("Creating hashes for new data...")
-    df_new['_comment_hash'] = df_new.apply(
-        create_unique_comment_hash, axis=1
-    )
+    df_new['_comment_hash'] = create_comment_hashes(df_new)
     
     # DEBUG: Mostrar algunos hashes de ejemplo
     logger.info("=== HASH DEBUGGING ===")
@@ -912,9 +1884,8 @@ def merge_comments(
         if removed_count > 0:
             logger.info(f"Removed {removed_count} obsolete registry entries")
     
-    # Combinar dataframes
+    # Combinar dataframes (conservando _comment_hash para persistirlo)
     df_combined = pd.concat([df_existing, df_truly_new], ignore_index=True)
-    df_combined = df_combined.drop(columns=['_comment_hash'])
     
     return df_combined
 
@@ -1045,23 +2016,95 @@ def save_to_excel(
         return False
 
 
-def load_existing_comments(filename: str) -> pd.DataFrame:
+def save_comments_data(
+    df: pd.DataFrame, 
+    database_filename: str, 
+    filename: str, 
+    scraper: Optional[SocialMediaScraper] = None, 
+    export_excel: bool = False, 
+    append_only: bool = True
+) -> bool:
+    """
+    Guarda los comentarios en la base de datos (almacenamiento principal) y,
+    opcionalmente, exporta el Excel con las hojas de resumen.
+    
+    La exportación reescribe el libro completo, por eso está desactivada por
+    defecto (excel_export en settings.json); para generarlo a demanda está
+    export_excel_from_database.
+    
+    Args:
+        df: DataFrame combinado con comentarios
+        database_filename: Archivo SQLite principal
+        filename: Nombre del archivo Excel de exportación
+        scraper: Objeto scraper (opcional, para el Excel)
+        export_excel: Si se genera también el Excel (reescritura completa)
+        append_only: Escribir solo las filas nuevas en lugar de reescribir
+            toda la base de datos
+        
+    Returns:
+        bool: True si se guardó la base de datos
+    """
+    if append_only:
+        saved = append_comments(database_filename, ensure_comment_hashes(df))
+    else:
+        saved = save_comments(database_filename, df)
+    if not saved:
+        return False
+    if export_excel:
+        save_to_excel(df, filename, scraper)
+    return True
+
+
+def export_excel_from_database(settings: Optional[dict] = None) -> bool:
+    """
+    Genera el Excel de comentarios a partir de la base de datos, a demanda.
+    
+    Uso: python extraer_comentarios.py --export-excel
+    
+    Args:
+        settings: Configuración (si es None se lee settings.json)
+        
+    Returns:
+        bool: True si se guardó el Excel
+    """
+    if settings is None:
+        settings = load_json_config("settings.json")
+    filename = settings.get('output_filename', 'Comentarios Campaña.xlsx')
+    database_filename = get_database_filename(settings)
+    
+    df = load_comments(database_filename)
+    if df.empty:
+        logger.warning(f"No comments in {database_filename}; Excel not exported")
+        return False
+    return save_to_excel(df, filename)
+
+
+def load_existing_comments(filename: str, database_filename: Optional[str] = None) -> pd.DataFrame:
     """
-    Carga los comentarios existentes del archivo Excel.
+    Carga los comentarios existentes de la base de datos o, si todavía no
+    tiene comentarios, del archivo Excel (se migran a la base al guardar).
     
     Args:
         filename: Nombre del archivo Excel
+        database_filename: Archivo SQLite principal (opcional)
         
     Returns:
         pd.DataFrame: DataFrame con comentarios existentes
     """
-    if not Path(filename).exists():
-        logger.info(f"No existing file found: {filename}. Will create new file.")
-        return pd.DataFrame()
-    
     try:
-        df_existing = pd.read_excel(filename, sheet_name='Comentarios')
-        logger.info(f"Loaded {len(df_existing)} existing rows from {filename}")
+        # La base puede existir sin comentarios (p. ej. solo con la caché de
+        # sentimientos del informe): en ese caso se usa el Excel
+        df_existing = load_comments(database_filename) if database_filename else pd.DataFrame()
+        source = database_filename
+        if df_existing.empty:
+            if not Path(filename).exists():
+                logger.info(f"No existing data found: {database_filename or filename}. Will create new file.")
+                return pd.DataFrame()
+            df_existing = pd.read_excel(filename, sheet_name='Comentarios')
+            source = filename
+        logger.info(f"Loaded {len(df_existing)} existing rows from {source}")
+        if df_existing.empty:
+            return df_existing
         
         # Normalizar los datos existentes
         df_existing = normalize_existing_data(df_existing)
@@ -1077,6 +2120,578 @@ def load_existing_comments(filename: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
+class ExtractionJournal:
+    """
+    Diario de checkpoints de la extracción (archivo JSON Lines junto al
+    archivo de salida).
+    
+    Cada URL completada se añade como una línea con sus filas procesadas en
+    cuanto termina su extracción, de modo que si el proceso se interrumpe
+    una nueva ejecución del mismo ciclo (día) puede saltarse esas URLs y
+    recuperar sus filas. El diario se vacía tras guardar con éxito.
+    """
+    
+    def __init__(self, path: Path, cycle: str):
+        """
+        Args:
+            path: Ruta del archivo del diario
+            cycle: Identificador del ciclo de extracción actual (YYYY-MM-DD)
+        """
+        self.path = Path(path)
+        self.cycle = cycle
+        self._lock = threading.Lock()
+
+    def load(self) -> Tuple[Dict[str, List[dict]], List[dict]]:
+        """
+        Lee el diario existente.
+        
+        Returns:
+            Tuple: (filas por URL completada en el ciclo actual,
+                    filas de ciclos anteriores que no llegaron a guardarse)
+        """
+        completed: Dict[str, List[dict]] = {}
+        stale_rows: List[dict] = []
+        if not self.path.exists():
+            return completed, stale_rows
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Línea truncada por una interrupción durante la escritura
+                    logger.warning(f"Ignoring corrupt journal line {line_number} in {self.path}")
+                    continue
+                if entry.get('cycle') == self.cycle:
+                    completed[entry['url']] = entry['rows']
+                else:
+                    stale_rows.extend(entry['rows'])
+        
+        return completed, stale_rows
+
+    def record(self, url: str, rows: List[dict]) -> None:
+        """Añade (thread-safe) las filas de una URL completada al diario"""
+        line = json.dumps(
+            {'cycle': self.cycle, 'url': url, 'rows': rows}, 
+            ensure_ascii=False, default=str
+        )
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        """Elimina el diario (después de guardar los datos con éxito)"""
+        with self._lock:
+            if self.path.exists():
+                self.path.unlink()
+
+
+def get_journal_filename(filename: str) -> Path:
+    """Ruta del diario de checkpoints, junto al archivo de salida"""
+    return Path(filename).with_suffix('.journal.jsonl')
+
+
+def get_run_profiles_filename(filename: str) -> Path:
+    """Ruta del archivo de perfiles de duración de runs, junto al archivo de salida"""
+    return Path(filename).with_suffix('.run_profiles.json')
+
+
+def load_run_profiles(filename: str) -> Dict[str, dict]:
+    """
+    Carga los perfiles de duración de runs de Apify aprendidos en
+    ejecuciones anteriores ({plataforma: {seconds_per_post, samples}}).
+    """
+    profiles_path = get_run_profiles_filename(filename)
+    if not profiles_path.exists():
+        return {}
+    try:
+        with open(profiles_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not load run profiles ({e}). Using default polling.")
+        return {}
+
+
+def save_run_profiles(filename: str, run_profiles: Dict[str, dict]) -> None:
+    """Guarda los perfiles de duración de runs junto al archivo de salida"""
+    if not run_profiles:
+        return
+    profiles_path = get_run_profiles_filename(filename)
+    try:
+        with open(profiles_path, 'w', encoding='utf-8') as f:
+            json.dump(run_profiles, f, indent=2, sort_keys=True)
+    except OSError as e:
+        logger.error(f"Error saving run profiles: {e}")
+
+
+def get_watermarks_filename(filename: str) -> Path:
+    """Ruta del archivo de marcas de agua, junto al archivo de salida"""
+    return Path(filename).with_suffix('.watermarks.json')
+
+
+def load_watermarks(filename: str) -> Dict[str, dict]:
+    """
+    Carga las marcas de agua por post de la extracción incremental.
+    
+    Cada entrada (clave post_url) contiene:
+        - latest_created_time: epoch del comentario más reciente guardado
+        - last_checked: fecha (YYYY-MM-DD) de la última extracción del post
+        - unchanged_runs: extracciones seguidas sin comentarios nuevos
+    
+    Args:
+        filename: Nombre del archivo de salida (Excel)
+        
+    Returns:
+        Dict[str, dict]: Marcas de agua por post_url (vacío si no existen)
+    """
+    watermarks_path = get_watermarks_filename(filename)
+    if not watermarks_path.exists():
+        logger.info(f"No watermarks file found: {watermarks_path}. Running full extraction.")
+        return {}
+    
+    try:
+        with open(watermarks_path, 'r', encoding='utf-8') as f:
+            watermarks = json.load(f)
+        logger.info(f"Loaded watermarks for {len(watermarks)} posts from {watermarks_path}")
+        return watermarks
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not load watermarks ({e}). Running full extraction.")
+        return {}
+
+
+def update_watermarks(
+    watermarks: Dict[str, dict], 
+    df: pd.DataFrame, 
+    processed_urls: List[str], 
+    failed_urls: List[str]
+) -> Dict[str, dict]:
+    """
+    Recalcula las marcas de agua a partir de los datos guardados.
+    
+    Args:
+        watermarks: Marcas de agua anteriores
+        df: DataFrame combinado que se acaba de guardar
+        processed_urls: URLs extraídas en esta ejecución
+        failed_urls: URLs cuya extracción falló (no cuentan como revisadas)
+        
+    Returns:
+        Dict[str, dict]: Marcas de agua actualizadas
+    """
+    latest_by_url = {}
+    if not df.empty and 'created_time_processed' in df.columns:
+        created = pd.to_datetime(df['created_time_processed'], errors='coerce')
+        latest = created.groupby(df['post_url']).max().dropna()
+        latest_by_url = {
+            url: int(pd.Timestamp(ts).timestamp()) for url, ts in latest.items()
+        }
+    
+    updated = {url: dict(entry) for url, entry in watermarks.items()}
+    for url, latest_epoch in latest_by_url.items():
+        updated.setdefault(url, {'unchanged_runs': 0, 'last_checked': None})
+        updated[url]['latest_created_time'] = latest_epoch
+    
+    today = datetime.now().strftime('%Y-%m-%d')
+    failed = set(failed_urls)
+    for url in processed_urls:
+        if url in failed:
+            continue
+        entry = updated.setdefault(url, {'unchanged_runs': 0})
+        previous_latest = watermarks.get(url, {}).get('latest_created_time')
+        changed = entry.get('latest_created_time') != previous_latest
+        entry['unchanged_runs'] = 0 if changed else entry.get('unchanged_runs', 0) + 1
+        entry['last_checked'] = today
+    
+    return updated
+
+
+def save_watermarks(filename: str, watermarks: Dict[str, dict]) -> bool:
+    """
+    Guarda las marcas de agua junto al archivo de salida.
+    
+    Returns:
+        bool: True si se guardó exitosamente
+    """
+    watermarks_path = get_watermarks_filename(filename)
+    try:
+        with open(watermarks_path, 'w', encoding='utf-8') as f:
+            json.dump(watermarks, f, ensure_ascii=False, indent=2, sort_keys=True)
+        logger.info(f"Watermarks saved for {len(watermarks)} posts: {watermarks_path}")
+        return True
+    except OSError as e:
+        logger.error(f"Error saving watermarks: {e}")
+        return False
+
+
+def should_skip_post(entry: Optional[dict], settings: dict) -> bool:
+    """
+    Indica si un post puede saltarse en la extracción incremental: lleva
+    incremental_skip_after_unchanged_runs extracciones sin comentarios
+    nuevos y se revisó hace menos de incremental_recheck_days días.
+    """
+    if not entry or not entry.get('last_checked'):
+        return False
+    
+    max_unchanged = settings.get('incremental_skip_after_unchanged_runs')
+    if not max_unchanged or entry.get('unchanged_runs', 0) < max_unchanged:
+        return False
+    
+    recheck_days = settings.get('incremental_recheck_days', 7)
+    last_checked = datetime.strptime(entry['last_checked'], '%Y-%m-%d')
+    return (datetime.now() - last_checked).days < recheck_days
+
+
+# ============================================================================
+# FUNCIONES DE EXTRACCIÓN (SECUENCIAL Y CONCURRENTE)
+# ============================================================================
+
+def build_url_entries(
+    scraper: SocialMediaScraper,
+    url: str,
+    platform: str,
+    post_number: int,
+    campaign_info: dict,
+    comments: List[dict]
+) -> List[dict]:
+    """
+    Devuelve las filas a guardar para una URL: sus comentarios, o una
+    entrada de registro si la extracción falló o no trajo comentarios.
+    
+    Si el scraper tiene un diario de checkpoints, las URLs completadas
+    (todas salvo las fallidas) se registran en él inmediatamente.
+    """
+    if url in scraper.failed_urls:
+        return [create_failed_registry_entry(url, platform, campaign_info, post_number)]
+    
+    if not comments and url in scraper.up_to_date_urls:
+        # Sin comentarios nuevos: las filas existentes del post se conservan
+        entries = []
+    elif not comments:
+        scraper._increment_stat('no_comments')
+        entries = [create_post_registry_entry(url, platform, campaign_info, post_number)]
+    else:
+        entries = comments
+    
+    if scraper.journal:
+        scraper.journal.record(url, entries)
+    return entries
+
+
+def extract_single_url(
+    scraper: SocialMediaScraper,
+    url: str,
+    platform: str,
+    post_number: int,
+    max_comments: int,
+    campaign_info: dict,
+    position: Tuple[int, int] = (1, 1)
+) -> List[dict]:
+    """
+    Extrae los comentarios de una URL y crea el registro correspondiente
+    si la extracción falló o no devolvió comentarios.
+    
+    Args:
+        scraper: Objeto scraper
+        url: URL a procesar
+        platform: Plataforma detectada (normalizada)
+        post_number: Número de post
+        max_comments: Número máximo de comentarios
+        campaign_info: Información de campaña
+        position: (índice, total) de la URL, solo para logging
+        
+    Returns:
+        List[dict]: Comentarios extraídos o una única entrada de registro
+    """
+    idx, total = position
+    logger.info(f"\n--- Processing URL {idx}/{total} (Post #{post_number}) ---")
+    logger.info(f"Platform: {platform}")
+    logger.info(f"URL: {url}")
+    
+    scrape_functions = {
+        'Facebook': scraper.scrape_facebook_comments,
+        'Instagram': scraper.scrape_instagram_comments,
+        'TikTok': scraper.scrape_tiktok_comments
+    }
+    
+    comments = scraper.scrape_with_retry(
+        scrape_functions[platform],
+        url, scraper.max_comments_for(url, max_comments), campaign_info, post_number
+    )
+    
+    return build_url_entries(scraper, url, platform, post_number, campaign_info, comments)
+
+
+def run_concurrent_extraction(
+    scraper: SocialMediaScraper,
+    tasks: List[Tuple[str, str, int]],
+    settings: dict,
+    max_comments: int,
+    campaign_info: dict
+) -> List[dict]:
+    """
+    Procesa varias URLs en paralelo con un número acotado de workers.
+    
+    Cada plataforma tiene además su propio límite de extracciones
+    simultáneas (max_workers_per_platform) para no saturar un mismo actor
+    de Apify. Los resultados se devuelven en el mismo orden de `tasks`,
+    igual que en la extracción secuencial.
+    
+    Args:
+        scraper: Objeto scraper (compartido entre workers)
+        tasks: Lista de (url, platform, post_number) en orden de procesamiento
+        settings: Configuración (max_workers, max_workers_per_platform, pausas)
+        max_comments: Número máximo de comentarios por post
+        campaign_info: Información de campaña
+        
+    Returns:
+        List[dict]: Comentarios y registros de todas las URLs, en orden
+    """
+    max_workers = max(1, int(settings.get('max_workers', 1)))
+    per_platform = settings.get('max_workers_per_platform', {})
+    pause_min = settings.get('pause_between_urls_min', 30)
+    pause_max = settings.get('pause_between_urls_max', 60)
+    
+    # Una cola por plataforma (en orden de `tasks`) y un contador de
+    # extracciones en curso: solo se entrega una URL al pool cuando su
+    # plataforma tiene hueco, para que un worker nunca quede bloqueado
+    # esperando a una plataforma saturada mientras otras esperan turno
+    pending: Dict[str, deque] = {}
+    for idx, (url, platform, post_number) in enumerate(tasks, 1):
+        pending.setdefault(platform, deque()).append((idx, url, post_number))
+    platform_limits = {
+        platform: max(1, int(per_platform.get(platform, max_workers)))
+        for platform in pending
+    }
+    running = dict.fromkeys(pending, 0)
+    total = len(tasks)
+    
+    logger.info(
+        f"Concurrent extraction: {total} URLs with {max_workers} workers "
+        f"(per-platform limits: {per_platform or 'none'})"
+    )
+    
+    def pause() -> None:
+        pausa = random.uniform(pause_min, pause_max)
+        logger.info(f"Worker pausing for {pausa:.2f} seconds before next URL...")
+        time.sleep(pausa)
+    
+    results: List[Optional[List[dict]]] = [None] * total
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # futuro -> (idx, plataforma); idx None para las pausas
+        in_flight: Dict = {}
+        while in_flight or any(pending.values()):
+            # Repartir en turno rotatorio entre plataformas con hueco
+            launched = True
+            while launched and len(in_flight) < max_workers:
+                launched = False
+                for platform, queue in pending.items():
+                    if len(in_flight) >= max_workers:
+                        break
+                    if not queue or running[platform] >= platform_limits[platform]:
+                        continue
+                    idx, url, post_number = queue.popleft()
+                    future = executor.submit(
+                        extract_single_url, scraper, url, platform, post_number,
+                        max_comments, campaign_info, position=(idx, total)
+                    )
+                    in_flight[future] = (idx, platform)
+                    running[platform] += 1
+                    launched = True
+            
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx, platform = in_flight.pop(future)
+                if idx is None:
+                    continue
+                results[idx - 1] = future.result()
+                running[platform] -= 1
+                # La pausa ocupa un worker pero libera la plataforma, para
+                # espaciar los lanzamientos de actores sin bloquear a otros
+                if idx <= total - max_workers:
+                    in_flight[executor.submit(pause)] = (None, platform)
+    
+    all_comments = []
+    for comments in results:
+        all_comments.extend(comments)
+    return all_comments
+
+
+def run_batch_extraction(
+    scraper: SocialMediaScraper,
+    tasks: List[Tuple[str, str, int]],
+    settings: dict,
+    max_comments: int,
+    campaign_info: dict
+) -> List[dict]:
+    """
+    Agrupa las URLs por plataforma y extrae cada grupo con uno o pocos
+    runs del actor (max_urls_per_batch URLs por run), en lugar de un run
+    por publicación.
+    
+    Los lotes se ejecutan en paralelo (max_workers) y los resultados se
+    reensamblan en el orden de `tasks`, con el mismo post_number y las
+    mismas entradas de registro que la extracción URL por URL.
+    
+    Args:
+        scraper: Objeto scraper
+        tasks: Lista de (url, platform, post_number) en orden de procesamiento
+        settings: Configuración (max_urls_per_batch, max_workers)
+        max_comments: Número máximo de comentarios por post
+        campaign_info: Información de campaña
+        
+    Returns:
+        List[dict]: Comentarios y registros de todas las URLs, en orden
+    """
+    batch_size = max(1, int(settings.get('max_urls_per_batch', 25)))
+    max_workers = max(1, int(settings.get('max_workers', 1)))
+    
+    posts_by_platform: Dict[str, List[Tuple[str, int]]] = {}
+    for url, platform, post_number in tasks:
+        posts_by_platform.setdefault(platform, []).append((url, post_number))
+    
+    batches = []
+    for platform, posts in posts_by_platform.items():
+        for start in range(0, len(posts), batch_size):
+            batches.append((platform, posts[start:start + batch_size]))
+    
+    logger.info(
+        f"Batch extraction: {len(tasks)} URLs in {len(batches)} actor runs "
+        f"({', '.join(f'{p}: {len(v)}' for p, v in posts_by_platform.items())})"
+    )
+    
+    # Las filas de cada lote se crean (y se registran en el diario de
+    # checkpoints) en cuanto termina el lote, no al final de todos
+    entries_by_url: Dict[str, List[dict]] = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        futures = {
+            executor.submit(
+                scraper.scrape_batch_with_retry,
+                platform, posts, max_comments, campaign_info
+            ): (platform, posts)
+            for platform, posts in batches
+        }
+        for future in as_completed(futures):
+            platform, posts = futures[future]
+            comments_by_url = future.result()
+            for url, post_number in posts:
+                entries_by_url[url] = build_url_entries(
+                    scraper, url, platform, post_number, campaign_info,
+                    comments_by_url.get(url, [])
+                )
+    
+    all_comments = []
+    for url, _, _ in tasks:
+        all_comments.extend(entries_by_url[url])
+    return all_comments
+
+
+async def extract_single_url_async(
+    scraper: AsyncSocialMediaScraper,
+    url: str,
+    platform: str,
+    post_number: int,
+    max_comments: int,
+    campaign_info: dict,
+    position: Tuple[int, int] = (1, 1)
+) -> List[dict]:
+    """Versión asíncrona de extract_single_url"""
+    idx, total = position
+    logger.info(f"\n--- Processing URL {idx}/{total} (Post #{post_number}) ---")
+    logger.info(f"Platform: {platform}")
+    logger.info(f"URL: {url}")
+    
+    comments = await scraper.scrape_with_retry(
+        lambda *args: scraper.scrape_comments(platform, *args),
+        url, scraper.max_comments_for(url, max_comments), campaign_info, post_number
+    )
+    
+    return build_url_entries(scraper, url, platform, post_number, campaign_info, comments)
+
+
+def run_async_extraction(
+    scraper: AsyncSocialMediaScraper,
+    tasks: List[Tuple[str, str, int]],
+    settings: dict,
+    max_comments: int,
+    campaign_info: dict
+) -> List[dict]:
+    """
+    Procesa todas las URLs en un único event loop con AsyncSocialMediaScraper.
+    
+    Usa los mismos límites que run_concurrent_extraction (max_workers y
+    max_workers_per_platform), pero cada run en curso solo ocupa una
+    corrutina, así que max_workers puede ser mucho mayor que el número de
+    hilos razonable. Los resultados conservan el orden de `tasks`.
+    
+    Args:
+        scraper: Scraper asíncrono
+        tasks: Lista de (url, platform, post_number) en orden de procesamiento
+        settings: Configuración (max_workers, max_workers_per_platform, pausas)
+        max_comments: Número máximo de comentarios por post
+        campaign_info: Información de campaña
+        
+    Returns:
+        List[dict]: Comentarios y registros de todas las URLs, en orden
+    """
+    max_workers = max(1, int(settings.get('max_workers', 1)))
+    per_platform = settings.get('max_workers_per_platform', {})
+    pause_min = settings.get('pause_between_urls_min', 30)
+    pause_max = settings.get('pause_between_urls_max', 60)
+    total = len(tasks)
+    
+    logger.info(
+        f"Async extraction: {total} URLs with up to {max_workers} concurrent runs "
+        f"(per-platform limits: {per_platform or 'none'})"
+    )
+    
+    async def extract_all() -> List[List[dict]]:
+        global_semaphore = asyncio.Semaphore(max_workers)
+        platform_semaphores = {
+            platform: asyncio.Semaphore(
+                max(1, int(per_platform.get(platform, max_workers)))
+            )
+            for platform in {platform for _, platform, _ in tasks}
+        }
+        
+        async def worker(idx: int, url: str, platform: str, post_number: int) -> List[dict]:
+            # Primero el límite de plataforma y después el global: una URL
+            # de una plataforma saturada no debe ocupar un slot global
+            async with platform_semaphores[platform]:
+                await global_semaphore.acquire()
+                try:
+                    result = await extract_single_url_async(
+                        scraper, url, platform, post_number,
+                        max_comments, campaign_info, position=(idx, total)
+                    )
+                except BaseException:
+                    global_semaphore.release()
+                    raise
+            # Espaciar el siguiente lanzamiento de este slot global, con la
+            # plataforma ya libre para otras URLs
+            try:
+                if idx <= total - max_workers:
+                    await asyncio.sleep(random.uniform(pause_min, pause_max))
+            finally:
+                global_semaphore.release()
+            return result
+        
+        return await asyncio.gather(*[
+            worker(idx, url, platform, post_number)
+            for idx, (url, platform, post_number) in enumerate(tasks, 1)
+        ])
+    
+    results = asyncio.run(extract_all())
+    
+    all_comments = []
+    for comments in results:
+        all_comments.extend(comments)
+    return all_comments
+
+
 # ============================================================================
 # FUNCIÓN PRINCIPAL
 # ============================================================================
@@ -1130,11 +2745,41 @@ def run_extraction():
     # ========================================================================
     
     filename = settings.get('output_filename', 'Comentarios Campaña.xlsx')
-    df_existing = load_existing_comments(filename)
-    
-    scraper = SocialMediaScraper(APIFY_TOKEN, settings)
+    database_filename = get_database_filename(settings)
+    export_excel = settings.get('excel_export', False)
+    append_only = settings.get('append_only_writes', True)
+    df_existing = load_existing_comments(filename, database_filename)
+    
+    extraction_mode = settings.get('extraction_mode', 'threads')
+    if extraction_mode == 'async':
+        scraper = AsyncSocialMediaScraper(APIFY_TOKEN, settings)
+    else:
+        scraper = SocialMediaScraper(APIFY_TOKEN, settings)
     all_comments = []
     
+    scraper.run_profiles = load_run_profiles(filename)
+    
+    # Checkpoints: recuperar las URLs ya completadas en este ciclo
+    journal = ExtractionJournal(
+        get_journal_filename(filename), datetime.now().strftime('%Y-%m-%d')
+    )
+    journaled_by_url, stale_journal_rows = journal.load()
+    if settings.get('checkpoint_extraction', True):
+        scraper.journal = journal
+    if journaled_by_url or stale_journal_rows:
+        logger.info(
+            f"Resuming from checkpoint journal: {len(journaled_by_url)} URLs already "
+            f"completed this cycle, {len(stale_journal_rows)} unsaved rows from earlier cycles"
+        )
+    
+    # Extracción incremental: solo comentarios posteriores a la marca de agua
+    incremental = settings.get('incremental_extraction', False)
+    watermarks = load_watermarks(filename)
+    if incremental and not df_existing.empty:
+        scraper.watermarks = watermarks
+        df_existing = ensure_comment_hashes(df_existing)
+        scraper.known_comment_hashes = set(df_existing['_comment_hash'].dropna())
+    
     # ========================================================================
     # 4. MAPEO DE URLs A POST NUMBERS
     # ========================================================================
@@ -1167,63 +2812,69 @@ def run_extraction():
     max_comments = settings.get('max_comments_per_post', 500)
     pause_min = settings.get('pause_between_urls_min', 30)
     pause_max = settings.get('pause_between_urls_max', 60)
+    max_workers = int(settings.get('max_workers', 1))
     
-    for idx, url in enumerate(valid_urls, 1):
-        post_number = url_to_post_number[url]
+    tasks = []
+    skipped_urls = []
+    for url in valid_urls:
         platform = scraper.detect_platform(url)
-        
         if not platform:
             logger.warning(f"Could not detect platform for URL: {url}")
             continue
-        
-        logger.info(f"\n--- Processing URL {idx}/{len(valid_urls)} (Post #{post_number}) ---")
-        logger.info(f"Platform: {platform}")
-        logger.info(f"URL: {url}")
-        
-        comments = []
-        
-        # Ejecutar scraping según plataforma
-        if platform == 'Facebook':
-            comments = scraper.scrape_with_retry(
-                scraper.scrape_facebook_comments, 
-                url, max_comments, campaign_info, post_number
-            )
-        elif platform == 'Instagram':
-            comments = scraper.scrape_with_retry(
-                scraper.scrape_instagram_comments, 
-                url, max_comments, campaign_info, post_number
-            )
-        elif platform == 'TikTok':
-            comments = scraper.scrape_with_retry(
-                scraper.scrape_tiktok_comments, 
-                url, max_comments, campaign_info, post_number
-            )
-        
-        # Crear registro según resultado
-        if url in scraper.failed_urls:
-            failed_entry = create_failed_registry_entry(
-                url, platform, campaign_info, post_number
-            )
-            all_comments.append(failed_entry)
-        elif not comments:
-            registry_entry = create_post_registry_entry(
-                url, platform, campaign_info, post_number
-            )
-            all_comments.append(registry_entry)
-            scraper.extraction_stats['no_comments'] += 1
-        else:
-            all_comments.extend(comments)
-        
-        # Pausa entre URLs (excepto la última)
-        if not solo_primer_post and idx < len(valid_urls):
-            pausa = random.uniform(pause_min, pause_max)
-            logger.info(f"Pausing for {pausa:.2f} seconds before next URL...")
-            time.sleep(pausa)
-        
-        # Break si solo queremos procesar el primer post (para testing)
-        if solo_primer_post:
-            logger.info("SOLO_PRIMER_POST enabled - stopping after first URL")
-            break
+        if scraper.watermarks and should_skip_post(scraper.watermarks.get(url), settings):
+            skipped_urls.append(url)
+            continue
+        if url in journaled_by_url:
+            continue
+        tasks.append((url, platform, url_to_post_number[url]))
+    
+    if skipped_urls:
+        logger.info(
+            f"Incremental mode: skipping {len(skipped_urls)} posts without new "
+            f"comments in recent runs"
+        )
+    
+    # Break si solo queremos procesar el primer post (para testing)
+    if solo_primer_post and tasks:
+        logger.info("SOLO_PRIMER_POST enabled - processing only the first URL")
+        tasks = tasks[:1]
+    
+    if extraction_mode == 'async':
+        all_comments = run_async_extraction(
+            scraper, tasks, settings, max_comments, campaign_info
+        )
+    elif extraction_mode == 'batch' and tasks:
+        all_comments = run_batch_extraction(
+            scraper, tasks, settings, max_comments, campaign_info
+        )
+    elif max_workers > 1 and len(tasks) > 1:
+        all_comments = run_concurrent_extraction(
+            scraper, tasks, settings, max_comments, campaign_info
+        )
+    else:
+        for idx, (url, platform, post_number) in enumerate(tasks, 1):
+            all_comments.extend(extract_single_url(
+                scraper, url, platform, post_number,
+                max_comments, campaign_info, position=(idx, len(tasks))
+            ))
+            
+            # Pausa entre URLs (excepto la última)
+            if idx < len(tasks):
+                pausa = random.uniform(pause_min, pause_max)
+                logger.info(f"Pausing for {pausa:.2f} seconds before next URL...")
+                time.sleep(pausa)
+    
+    # Añadir las filas recuperadas del diario de checkpoints
+    journaled_rows = [row for rows in journaled_by_url.values() for row in rows]
+    all_comments = stale_journal_rows + journaled_rows + all_comments
+    processed_urls = list(journaled_by_url) + [url for url, _, _ in tasks]
+    
+    save_run_profiles(filename, scraper.run_profiles)
+    if scraper.pending_runs:
+        logger.warning(
+            f"⚠️  {len(scraper.pending_runs)} Apify runs were still running when "
+            f"all attempts were exhausted"
+        )
     
     # ========================================================================
     # 6. POST-PROCESAMIENTO Y GUARDADO
@@ -1250,13 +2901,19 @@ def run_extraction():
             'post_url_original', 'author_name', 'comment_text', 'created_time',
             'created_time_processed', 'fecha_comentario', 'hora_comentario', 
             'likes_count', 'replies_count', 'is_reply', 'author_url', 
-            'extraction_status', 'created_time_raw'
+            'extraction_status', 'created_time_raw', '_comment_hash'
         ]
         existing_cols = [col for col in final_columns if col in df_combined.columns]
         df_combined = df_combined[existing_cols]
         
         # Guardar
-        save_to_excel(df_combined, filename, scraper)
+        if save_comments_data(
+            df_combined, database_filename, filename, scraper, export_excel, append_only
+        ):
+            save_watermarks(filename, update_watermarks(
+                watermarks, df_combined, processed_urls, scraper.failed_urls
+            ))
+            journal.clear()
         
         # ====================================================================
         # 7. REPORTE FINAL
@@ -1286,12 +2943,20 @@ def run_extraction():
                 logger.warning(f"  - {failed_url}")
         
         logger.info("")
-        logger.info(f"✅ File saved: {filename}")
+        logger.info(f"✅ Database saved: {database_filename}")
+        if export_excel:
+            logger.info(f"✅ File saved: {filename}")
         logger.info("=" * 70)
     else:
         logger.warning("No new data to process")
         if not df_existing.empty:
-            save_to_excel(df_existing, filename, scraper)
+            if save_comments_data(
+                df_existing, database_filename, filename, scraper, export_excel, append_only
+            ):
+                save_watermarks(filename, update_watermarks(
+                    watermarks, df_existing, processed_urls, scraper.failed_urls
+                ))
+        journal.clear()
 
 
 # ============================================================================
@@ -1299,6 +2964,9 @@ def run_extraction():
 # ============================================================================
 
 if __name__ == "__main__":
-    run_extraction()
+    if "--export-excel" in sys.argv:
+        export_excel_from_database()
+    else:
+        run_extraction()
 
 
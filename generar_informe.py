@@ -1,27 +1,519 @@
 import pandas as pd
-from pysentimiento import create_analyzer
 import os
 import json
 import sys
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Importar el clasificador de temas desde config
 sys.path.insert(0, str(Path(__file__).parent / "config"))
-from topic_classifier import create_topic_classifier, get_campaign_metadata
+from topic_classifier import classify_series, get_campaign_metadata
+from almacenamiento import (
+    load_comments, get_database_filename, 
+    text_hash, load_sentiment_cache, save_sentiment_cache
+)
+
+CONFIG_DIR = Path(__file__).parent / "config"
+DEFAULT_SENTIMENT_MODEL = "pysentimiento/robertuito-sentiment-analysis"
+
+# Backends de inferencia: el modelo original o su versión cuantizada a int8
+SENTIMENT_BACKENDS = ("pytorch", "quantized")
+
+# Modos de salida del informe: todo en index.html, o index.html más un
+# archivo de comentarios por día que la página descarga cuando los necesita
+REPORT_OUTPUT_MODES = ("inline", "shards")
+
+# Etiquetas de pysentimiento y su nombre en el panel
+SENTIMENT_LABELS = {
+    "POS": "Positivo", 
+    "NEG": "Negativo", 
+    "NEU": "Neutro"
+}
+
+
+def load_report_settings():
+    """Carga config/settings.json (vacío si no existe)"""
+    try:
+        with open(CONFIG_DIR / "settings.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def predict_sentiments(sentiment_analyzer, texts, batch_size=16):
+    """
+    Calcula las probabilidades de sentimiento de todos los textos en lotes.
+    
+    Usa directamente el tokenizador y el modelo del analizador (con el mismo
+    preprocesamiento que analyzer.predict): los textos se ordenan por número
+    de tokens para que cada lote agrupe comentarios de tamaño parecido y el
+    relleno sea mínimo, y el resultado vuelve en el orden original.
+    
+    Args:
+        sentiment_analyzer: Analizador de pysentimiento
+        texts: Lista de textos
+        batch_size: Número de comentarios por lote
+        
+    Returns:
+        list: Diccionario {etiqueta: probabilidad} de cada texto
+    """
+    if not texts:
+        return []
+    
+    import torch
+    from pysentimiento.preprocessing import preprocess_tweet
+    
+    tokenizer = sentiment_analyzer.tokenizer
+    model = sentiment_analyzer.model
+    id2label = model.config.id2label
+    device = next(model.parameters()).device
+    
+    preprocessed = [
+        preprocess_tweet(text, **sentiment_analyzer.preprocessing_args) for text in texts
+    ]
+    encodings = tokenizer(
+        preprocessed, truncation=True, max_length=tokenizer.model_max_length
+    )['input_ids']
+    order = sorted(range(len(texts)), key=lambda i: len(encodings[i]))
+    
+    probabilities = [None] * len(texts)
+    model.eval()
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            batch = tokenizer.pad(
+                {'input_ids': [encodings[i] for i in bucket]}, return_tensors='pt'
+            ).to(device)
+            probs = torch.softmax(model(**batch).logits, dim=-1).tolist()
+            for i, row in zip(bucket, probs):
+                probabilities[i] = {id2label[j]: p for j, p in enumerate(row)}
+    
+    return probabilities
+
+
+def create_sentiment_analyzer(model_name, backend="pytorch"):
+    """
+    Importa pysentimiento (y con él transformers/torch) y carga el modelo
+    solo cuando hay textos que puntuar, mostrando cuánto tarda.
+    
+    Con el backend "quantized" las capas lineales del modelo se cuantizan
+    dinámicamente a int8 (torch.ao.quantization), lo que acelera la
+    inferencia en CPU sin dependencias adicionales.
+    
+    Args:
+        model_name: Modelo de sentimiento
+        backend: "pytorch" o "quantized"
+        
+    Returns:
+        Analizador de pysentimiento
+    """
+    if backend not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Backend de sentimiento no válido: {backend}")
+    
+    start = time.perf_counter()
+    from pysentimiento import create_analyzer
+    imported = time.perf_counter()
+    sentiment_analyzer = create_analyzer(task="sentiment", lang="es", model_name=model_name)
+    if backend == "quantized":
+        import torch
+        sentiment_analyzer.model = torch.ao.quantization.quantize_dynamic(
+            sentiment_analyzer.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    loaded = time.perf_counter()
+    print(f"Modelo de sentimiento listo ({backend}): importación {imported - start:.1f}s, "
+          f"carga {loaded - imported:.1f}s.")
+    return sentiment_analyzer
+
+
+def sentiment_cache_key(model_name, backend="pytorch"):
+    """Versión del modelo en la caché (los resultados cuantizados van aparte)"""
+    return model_name if backend == "pytorch" else f"{model_name}#{backend}"
+
+
+# Analizador de cada proceso del pool (se carga una vez por proceso)
+_worker_analyzer = None
+
+
+def _init_sentiment_worker(model_name, backend, threads):
+    """Inicializa un proceso del pool: fija sus hilos y carga el modelo"""
+    global _worker_analyzer
+    import torch
+    torch.set_num_threads(threads)
+    _worker_analyzer = create_sentiment_analyzer(model_name, backend)
+
+
+def _score_shard(shard, batch_size):
+    """Puntúa una parte de los textos con el analizador del proceso"""
+    return predict_sentiments(_worker_analyzer, shard, batch_size)
+
+
+def predict_sentiments_parallel(texts, model_name, batch_size=16, workers=2, backend="pytorch"):
+    """
+    Versión multiproceso de predict_sentiments: reparte los textos entre
+    varios procesos, cada uno con su propio modelo, y reúne los resultados
+    en el orden original.
+    
+    Los textos se reparten de forma intercalada (texto i al proceso
+    i % workers) para que todos los procesos reciban textos de longitudes
+    parecidas, y los hilos de torch se dividen entre los procesos.
+    
+    Args:
+        texts: Lista de textos
+        model_name: Modelo de sentimiento a cargar en cada proceso
+        batch_size: Número de comentarios por lote
+        workers: Número de procesos
+        backend: "pytorch" o "quantized"
+        
+    Returns:
+        list: Diccionario {etiqueta: probabilidad} de cada texto
+    """
+    workers = max(1, min(workers, len(texts)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    shards = [texts[k::workers] for k in range(workers)]
+    
+    with ProcessPoolExecutor(
+        max_workers=workers, 
+        initializer=_init_sentiment_worker, 
+        initargs=(model_name, backend, threads)
+    ) as pool:
+        results = list(pool.map(_score_shard, shards, [batch_size] * workers))
+    
+    probabilities = [None] * len(texts)
+    for k, shard_probabilities in enumerate(results):
+        probabilities[k::workers] = shard_probabilities
+    return probabilities
+
+
+def sentiment_label(probas):
+    """Etiqueta del panel (Positivo/Negativo/Neutro) de la clase más probable"""
+    return SENTIMENT_LABELS.get(max(probas, key=probas.get), "Neutro")
+
+
+def score_sentiments(texts, settings, database_filename):
+    """
+    Obtiene el sentimiento de cada texto consultando primero la caché
+    persistente (hash del texto y modelo); solo se pasan por el modelo los
+    textos que no están en ella, y sus resultados se añaden a la caché.
+    
+    Args:
+        texts: Lista de textos
+        settings: Configuración (settings.json)
+        database_filename: Base de datos que contiene la caché
+        
+    Returns:
+        list: Diccionario {etiqueta: probabilidad} de cada texto
+    """
+    model_name = settings.get('sentiment_model', DEFAULT_SENTIMENT_MODEL)
+    batch_size = int(settings.get('sentiment_batch_size', 16))
+    use_cache = settings.get('sentiment_cache', True)
+    workers = int(settings.get('sentiment_workers', 1))
+    backend = settings.get('sentiment_backend', 'pytorch')
+    cache_key = sentiment_cache_key(model_name, backend)
+    
+    hashes = [text_hash(text) for text in texts]
+    known = load_sentiment_cache(database_filename, cache_key, set(hashes)) if use_cache else {}
+    
+    pending = {}
+    for row_hash, text in zip(hashes, texts):
+        if row_hash not in known:
+            pending.setdefault(row_hash, text)
+    print(f"Sentimientos en caché: {len(texts) - sum(h not in known for h in hashes)}; "
+          f"por calcular: {len(pending)} textos.")
+    
+    if pending:
+        pending_texts = list(pending.values())
+        # El pool solo compensa si cada proceso recibe al menos un lote
+        if workers > 1 and len(pending_texts) >= workers * batch_size:
+            print(f"Calculando sentimientos con {workers} procesos...")
+            probabilities = predict_sentiments_parallel(
+                pending_texts, model_name, batch_size, workers, backend
+            )
+        else:
+            sentiment_analyzer = create_sentiment_analyzer(model_name, backend)
+            probabilities = predict_sentiments(sentiment_analyzer, pending_texts, batch_size)
+        scored = dict(zip(pending, probabilities))
+        if use_cache:
+            save_sentiment_cache(database_filename, cache_key, scored)
+        known.update(scored)
+    
+    return [known[row_hash] for row_hash in hashes]
+
+
+def normalize_comment_text(text):
+    """
+    Clave de memoria de un comentario: el texto sin espacios en los extremos.
+    
+    Se conservan mayúsculas y espacios internos porque el modelo de
+    sentimiento recibe el texto tal cual (su preprocesamiento ya recorta los
+    extremos, y el clasificador de temas también los recorta).
+    """
+    return str(text).strip()
+
+
+class AnalysisMemo:
+    """
+    Memoria LRU acotada de resultados por texto normalizado, compartida por
+    los pasos de análisis del informe (temas y sentimiento), con contadores
+    de aciertos por paso.
+    """
+    
+    def __init__(self, maxsize=100000):
+        """
+        Args:
+            maxsize: Número máximo de resultados guardados (entre todos los pasos)
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = Counter()
+        self.misses = Counter()
+    
+    def map(self, step, texts, compute):
+        """
+        Resultado de cada texto para un paso del análisis.
+        
+        Los textos cuya clave ya está en memoria (o se repite en la lista) no
+        se recalculan; el resto se pasa a `compute` en una sola llamada para
+        conservar el procesamiento por lotes.
+        
+        Args:
+            step: Nombre del paso ('tema', 'sentimiento'...)
+            texts: Lista de textos
+            compute: Función lista de textos -> lista de resultados
+            
+        Returns:
+            list: Resultado de cada texto, en el orden de entrada
+        """
+        keys = [normalize_comment_text(text) for text in texts]
+        results = {}
+        pending = []
+        for key in keys:
+            if key in results:
+                self.hits[step] += 1
+            elif (step, key) in self._entries:
+                self._entries.move_to_end((step, key))
+                results[key] = self._entries[(step, key)]
+                self.hits[step] += 1
+            else:
+                results[key] = None
+                pending.append(key)
+                self.misses[step] += 1
+        
+        if pending:
+            for key, value in zip(pending, compute(pending)):
+                results[key] = value
+                self._entries[(step, key)] = value
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        
+        return [results[key] for key in keys]
+    
+    def hit_rate(self, step):
+        """Fracción de textos de un paso resueltos desde la memoria"""
+        total = self.hits[step] + self.misses[step]
+        return self.hits[step] / total if total else 0.0
+    
+    def print_stats(self):
+        """Muestra los aciertos de cada paso"""
+        for step in sorted(set(self.hits) | set(self.misses)):
+            total = self.hits[step] + self.misses[step]
+            print(f"Memoria de análisis ({step}): {self.hits[step]}/{total} textos "
+                  f"reutilizados ({self.hit_rate(step):.1%}).")
+
+
+def build_dashboard_cube(df_comments, posts):
+    """
+    Cubo de conteos de comentarios por hora × pauta × tema × sentimiento para
+    las gráficas y tarjetas del panel (la red social sale de la pauta).
+    
+    Args:
+        df_comments: Comentarios analizados (created_time_colombia, post_url,
+            tema y sentimiento)
+        posts: Pautas del panel (post_url y platform)
+        
+    Returns:
+        dict: Dimensiones (hours, posts, post_platforms, topics, sentiments) y
+        celdas como lista plana de quíntuplas hora, pauta, tema, sentimiento,
+        conteo (con los índices de cada dimensión), en el orden en que
+        aparecen los comentarios
+    """
+    hour_codes, hours = pd.factorize(df_comments['created_time_colombia'].dt.strftime('%Y-%m-%dT%H'))
+    topic_codes, topics = pd.factorize(df_comments['tema'])
+    sentiment_codes, sentiments = pd.factorize(df_comments['sentimiento'])
+    post_codes = pd.Index(posts['post_url']).get_indexer(df_comments['post_url'])
+    
+    cells = pd.DataFrame({
+        'hour': hour_codes, 
+        'post': post_codes, 
+        'topic': topic_codes, 
+        'sentiment': sentiment_codes
+    }).groupby(['hour', 'post', 'topic', 'sentiment'], sort=False).size()
+    
+    return {
+        'hours': hours.tolist(),
+        'posts': posts['post_url'].tolist(),
+        'post_platforms': posts['platform'].tolist(),
+        'topics': topics.tolist(),
+        'sentiments': sentiments.tolist(),
+        'cells': cells.reset_index().values.ravel().tolist()
+    }
+
+
+def encode_comments_columnar(df_for_json):
+    """
+    Codifica los comentarios del panel por columnas para reducir el tamaño
+    del JSON y el tiempo de JSON.parse en el navegador.
+    
+    - date: segundos desde date_base (fecha local tratada como UTC)
+    - comment: textos tal cual
+    - sentiment, topic, platform y post: diccionario de valores ('values')
+      y un índice por comentario ('codes', -1 si falta); cada valor de post
+      es el par [post_url, post_label]
+    
+    Args:
+        df_for_json: Comentarios con date (texto ISO), comment, sentiment,
+            topic, platform, post_url y post_label
+        
+    Returns:
+        dict: Bloque de columnas (lo decodifica decodeComments en la página)
+    """
+    seconds = (pd.to_datetime(df_for_json['date']) - pd.Timestamp('1970-01-01')) // pd.Timedelta(seconds=1)
+    date_base = int(seconds.min()) if len(seconds) else 0
+    
+    encoded = {
+        'length': len(df_for_json),
+        'date_base': date_base,
+        'date': (seconds - date_base).tolist(),
+        'comment': df_for_json['comment'].tolist()
+    }
+    for column in ('sentiment', 'topic', 'platform'):
+        codes, values = pd.factorize(df_for_json[column])
+        encoded[column] = {'values': values.tolist(), 'codes': codes.tolist()}
+    
+    codes, post_urls = pd.factorize(df_for_json['post_url'])
+    post_labels = df_for_json.drop_duplicates('post_url').set_index('post_url')['post_label']
+    encoded['post'] = {
+        'values': [[url, post_labels[url]] for url in post_urls],
+        'codes': codes.tolist()
+    }
+    return encoded
+
+
+def write_comment_shards(df_for_json, data_dir):
+    """
+    Escribe los comentarios del panel en un archivo JSON por día
+    (comments-AAAA-MM-DD.json, codificado por columnas) y elimina los de
+    días que ya no existen.
+    
+    Los archivos cuyo contenido no cambia no se reescriben, para que el
+    servidor y el navegador puedan seguir usando su copia en caché.
+    
+    Args:
+        df_for_json: Comentarios del panel (date como texto ISO), ordenados
+        data_dir: Carpeta de los archivos
+        
+    Returns:
+        int: Número de archivos escritos o actualizados
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    
+    days = df_for_json['date'].str[:10]
+    written = 0
+    for day, df_day in df_for_json.groupby(days, sort=False):
+        shard_path = data_dir / f"comments-{day}.json"
+        content = json.dumps(encode_comments_columnar(df_day))
+        if shard_path.exists() and shard_path.read_text(encoding='utf-8') == content:
+            continue
+        shard_path.write_text(content, encoding='utf-8')
+        written += 1
+    
+    existing_days = set(days)
+    for shard_path in data_dir.glob("comments-*.json"):
+        if shard_path.stem[len("comments-"):] not in existing_days:
+            shard_path.unlink()
+    
+    return written
+
+
+def benchmark_sentiment_backends(sample_size=500):
+    """
+    Compara el backend cuantizado con el original sobre una muestra de los
+    comentarios guardados: concordancia de etiquetas (Positivo/Negativo/
+    Neutro) y tiempo por comentario de cada backend.
+    
+    Uso: python generar_informe.py --benchmark-sentiment [tamaño_muestra]
+    
+    Args:
+        sample_size: Número máximo de comentarios a evaluar
+        
+    Returns:
+        dict: Concordancia, milisegundos por comentario y aceleración
+    """
+    settings = load_report_settings()
+    model_name = settings.get('sentiment_model', DEFAULT_SENTIMENT_MODEL)
+    batch_size = int(settings.get('sentiment_batch_size', 16))
+    
+    df = load_comments(get_database_filename())
+    if df.empty:
+        df = pd.read_excel('Comentarios Campaña.xlsx')
+    texts = [str(text) for text in df['comment_text'].dropna()]
+    texts = list(dict.fromkeys(texts))[:sample_size]
+    print(f"Comparando backends de sentimiento sobre {len(texts)} comentarios...")
+    
+    labels = {}
+    ms_per_comment = {}
+    for backend in SENTIMENT_BACKENDS:
+        sentiment_analyzer = create_sentiment_analyzer(model_name, backend)
+        start = time.perf_counter()
+        probabilities = predict_sentiments(sentiment_analyzer, texts, batch_size)
+        elapsed = time.perf_counter() - start
+        labels[backend] = [sentiment_label(probas) for probas in probabilities]
+        ms_per_comment[backend] = 1000 * elapsed / max(len(texts), 1)
+        print(f"  • {backend}: {ms_per_comment[backend]:.1f} ms/comentario")
+    
+    matches = sum(a == b for a, b in zip(labels["pytorch"], labels["quantized"]))
+    agreement = matches / max(len(texts), 1)
+    speedup = ms_per_comment["pytorch"] / max(ms_per_comment["quantized"], 1e-9)
+    print(f"  • Concordancia de etiquetas: {matches}/{len(texts)} ({agreement:.1%})")
+    print(f"  • Aceleración del backend cuantizado: {speedup:.2f}x")
+    
+    for label in SENTIMENT_LABELS.values():
+        original = sum(l == label for l in labels["pytorch"])
+        quantized = sum(l == label for l in labels["quantized"])
+        print(f"    {label}: {original} (pytorch) / {quantized} (quantized)")
+    
+    return {
+        'agreement': agreement, 
+        'ms_per_comment': ms_per_comment, 
+        'speedup': speedup
+    }
 
 
 def run_report_generation():
     """
-    Lee los datos del Excel, realiza el análisis de sentimientos y temas,
-    y genera el panel HTML interactivo como 'index.html'.
+    Lee los datos de la base de datos de comentarios (o del Excel si aún no
+    existe), realiza el análisis de sentimientos y temas, y genera el panel
+    HTML interactivo como 'index.html'.
     """
     print("--- INICIANDO GENERACIÓN DE INFORME HTML ---")
+    report_start = time.perf_counter()
     
-    try:
-        df = pd.read_excel('Comentarios Campaña.xlsx')
-        print("Archivo 'Comentarios Campaña.xlsx' cargado con éxito.")
-    except FileNotFoundError:
-        print("❌ ERROR: No se encontró el archivo 'Comentarios Campaña.xlsx'.")
+    database_filename = get_database_filename()
+    df = load_comments(database_filename)
+    if not df.empty:
+        print(f"Base de datos '{database_filename}' cargada con éxito ({len(df)} filas).")
+    else:
+        try:
+            df = pd.read_excel('Comentarios Campaña.xlsx')
+            print("Archivo 'Comentarios Campaña.xlsx' cargado con éxito.")
+        except FileNotFoundError:
+            print("❌ ERROR: No se encontró el archivo 'Comentarios Campaña.xlsx'.")
+            return
+    
+    if df.empty:
+        print("❌ ERROR: No hay comentarios para generar el informe.")
         return
 
     # --- Limpieza y preparación de datos ---
@@ -60,25 +552,30 @@ def run_report_generation():
 
     print("Analizando sentimientos y temas...")
     
-    # Análisis de sentimientos
-    sentiment_analyzer = create_analyzer(task="sentiment", lang="es")
-    df_comments['sentimiento'] = df_comments['comment_text'].apply(
-        lambda text: {
-            "POS": "Positivo", 
-            "NEG": "Negativo", 
-            "NEU": "Neutro"
-        }.get(sentiment_analyzer.predict(str(text)).output, "Neutro")
+    # Los comentarios repetidos ("Amén", "Hermoso", spam...) se analizan una
+    # sola vez por texto normalizado
+    settings = load_report_settings()
+    analysis_memo = AnalysisMemo(int(settings.get('analysis_memo_size', 100000)))
+    comment_texts = df_comments['comment_text'].tolist()
+    
+    # Análisis de sentimientos (caché + lotes)
+    probabilities = analysis_memo.map(
+        'sentimiento', 
+        comment_texts, 
+        lambda texts: score_sentiments(texts, settings, database_filename)
     )
+    df_comments['sentimiento'] = [sentiment_label(probas) for probas in probabilities]
     
     # ========================================================================
     # CLASIFICACIÓN DE TEMAS - USANDO ARCHIVO EXTERNO
     # ========================================================================
     
-    # Cargar el clasificador personalizado
-    topic_classifier = create_topic_classifier()
-    
-    # Aplicar clasificación
-    df_comments['tema'] = df_comments['comment_text'].apply(topic_classifier)
+    # Aplicar el clasificador personalizado a los textos distintos
+    df_comments['tema'] = analysis_memo.map(
+        'tema', 
+        comment_texts, 
+        lambda texts: classify_series(pd.Series(texts, dtype=object)).tolist()
+    )
     
     # Mostrar metadata de la campaña (opcional)
     campaign_info = get_campaign_metadata()
@@ -101,7 +598,27 @@ def run_report_generation():
     }, inplace=True)
     
     df_for_json['date'] = df_for_json['date'].dt.strftime('%Y-%m-%dT%H:%M:%S')
-    all_data_json = json.dumps(df_for_json.to_dict('records'))
+    
+    # Del más reciente al más antiguo (orden del listado de comentarios)
+    df_for_json.sort_values('date', ascending=False, kind='stable', inplace=True)
+    
+    # Los comentarios van dentro de la página o en archivos por día
+    output_mode = settings.get('report_output_mode', 'inline')
+    if output_mode not in REPORT_OUTPUT_MODES:
+        print(f"⚠️  report_output_mode '{output_mode}' no válido; se usa 'inline'.")
+        output_mode = 'inline'
+    data_dir = settings.get('report_data_dir', 'report_data')
+    if output_mode == 'shards':
+        written = write_comment_shards(df_for_json, data_dir)
+        print(f"Comentarios en '{data_dir}/': {written} archivos por día actualizados.")
+        data_store_script = ''
+    else:
+        data_store_script = f'<script id="data-store" type="application/json">{json.dumps(encode_comments_columnar(df_for_json))}</script>'
+    report_config_json = json.dumps({'mode': output_mode, 'data_path': data_dir})
+    
+    # Cubo de conteos: las gráficas y tarjetas se calculan sobre él y no
+    # sobre cada comentario
+    cube_json = json.dumps(build_dashboard_cube(df_comments, unique_posts))
 
     # Fechas min/max
     min_date = df_comments['created_time_colombia'].min().strftime('%Y-%m-%d') if not df_comments.empty else ''
@@ -157,8 +674,272 @@ def run_report_generation():
         </style>
     </head>
     <body>
-        <script id="data-store" type="application/json">{all_data_json}</script>
+        <script id="report-config" type="application/json">{report_config_json}</script>
+        {data_store_script}
         <script id="posts-data-store" type="application/json">{all_posts_json}</script>
+        <script id="cube-store" type="application/json">{cube_json}</script>
+        <script id="dashboard-worker" type="text/js-worker">
+            // Motor de datos del panel: corre en un Web Worker, es dueño del cubo y de
+            // los comentarios y solo devuelve resúmenes y páginas del listado
+            const createEngine = ({{ cube: cubeJson, data, dataUrl, pageSize }}) => {{
+                const cube = JSON.parse(cubeJson);
+                
+                // La pauta seleccionada tiene prioridad sobre la red social
+                const matchesPost = (filters, postUrl, platform) =>
+                    filters.selectedPost !== 'Todas' ? postUrl === filters.selectedPost : (filters.selectedPlatform === 'Todas' || platform === filters.selectedPlatform);
+                
+                // Días con comentarios, del más reciente al más antiguo
+                const campaignDays = [...new Set(cube.hours.map(h => h.substring(0, 10)))].sort().reverse();
+                
+                // Comentarios de cada día (del más reciente al más antiguo). En modo
+                // 'inline' llegan con el mensaje de inicio; en modo 'shards' cada día se
+                // descarga la primera vez que se necesita (listado u horas cortadas por el rango).
+                // Convierte un bloque de columnas (encode_comments_columnar) en comentarios
+                const decodeComments = (block) => {{
+                    const decode = (column, i) => column.codes[i] < 0 ? null : column.values[column.codes[i]];
+                    const pad = n => (n < 10 ? '0' : '') + n;
+                    const comments = new Array(block.length);
+                    let currentHour = NaN, hourPrefix = '';
+                    for (let i = 0; i < block.length; i++) {{
+                        // Fecha 'AAAA-MM-DDTHH:MM:SS' (el prefijo de la hora se formatea una vez por hora)
+                        const seconds = block.date_base + block.date[i];
+                        const hour = Math.floor(seconds / 3600), rest = seconds - hour * 3600;
+                        if (hour !== currentHour) {{
+                            currentHour = hour;
+                            hourPrefix = new Date(hour * 3600000).toISOString().substring(0, 14);
+                        }}
+                        const post = decode(block.post, i);
+                        comments[i] = {{
+                            date: hourPrefix + pad(Math.floor(rest / 60)) + ':' + pad(rest % 60),
+                            comment: block.comment[i],
+                            sentiment: decode(block.sentiment, i),
+                            topic: decode(block.topic, i),
+                            platform: decode(block.platform, i),
+                            post_url: post && post[0],
+                            post_label: post && post[1]
+                        }};
+                    }}
+                    return comments;
+                }};
+                
+                // Índice de un día, armado una sola vez al cargarlo: las filas siguen
+                // ordenadas por fecha descendente (índice de tiempo) y cada valor de
+                // pauta, red social, tema y sentimiento tiene un bitset con sus filas
+                const buildDayIndex = (rows) => {{
+                    const words = (rows.length + 31) >>> 5;
+                    const index = {{ rows, post: new Map(), platform: new Map(), topic: new Map(), sentiment: new Map() }};
+                    const setBit = (bitsets, value, i) => {{
+                        let bits = bitsets.get(value);
+                        if (!bits) {{
+                            bits = new Uint32Array(words);
+                            bitsets.set(value, bits);
+                        }}
+                        bits[i >>> 5] |= 1 << (i & 31);
+                    }};
+                    rows.forEach((d, i) => {{
+                        setBit(index.post, d.post_url, i);
+                        setBit(index.platform, d.platform, i);
+                        setBit(index.topic, d.topic, i);
+                        setBit(index.sentiment, d.sentiment, i);
+                    }});
+                    return index;
+                }};
+                
+                // Primera fila cuya fecha cumple la condición (las fechas van de mayor a menor)
+                const firstRow = (rows, condition) => {{
+                    let lo = 0, hi = rows.length;
+                    while (lo < hi) {{
+                        const mid = (lo + hi) >>> 1;
+                        if (condition(rows[mid].date)) hi = mid; else lo = mid + 1;
+                    }}
+                    return lo;
+                }};
+                
+                // Comentarios de un día que pasan los filtros, del más reciente al más
+                // antiguo: búsqueda binaria del rango de fechas e intersección de bitsets
+                const queryDay = (index, filters, sentiment) => {{
+                    const rows = index.rows;
+                    const lo = firstRow(rows, date => date <= filters.endFilter);
+                    const hi = firstRow(rows, date => date < filters.startFilter);
+                    const selected = [];
+                    if (filters.selectedPost !== 'Todas') selected.push(index.post.get(filters.selectedPost));
+                    else if (filters.selectedPlatform !== 'Todas') selected.push(index.platform.get(filters.selectedPlatform));
+                    if (filters.selectedTopic !== 'Todos') selected.push(index.topic.get(filters.selectedTopic));
+                    if (sentiment !== 'Todos') selected.push(index.sentiment.get(sentiment));
+                    const result = [];
+                    if (lo >= hi || selected.some(bits => !bits)) return result;
+                    for (let w = lo >>> 5; w <= (hi - 1) >>> 5; w++) {{
+                        const first = w * 32;
+                        let word = -1;
+                        for (const bits of selected) word &= bits[w];
+                        if (first < lo) word &= -1 << (lo - first);
+                        if (first + 32 > hi) word &= (1 << (hi - first)) - 1;
+                        while (word) {{
+                            result.push(rows[first + 31 - Math.clz32(word & -word)]);
+                            word &= word - 1;
+                        }}
+                    }}
+                    return result;
+                }};
+                
+                const commentsByDay = new Map();
+                const pendingDays = new Map();
+                if (data !== null) {{
+                    const rowsByDay = new Map();
+                    decodeComments(JSON.parse(data)).forEach(d => {{
+                        const day = d.date.substring(0, 10);
+                        if (!rowsByDay.has(day)) rowsByDay.set(day, []);
+                        rowsByDay.get(day).push(d);
+                    }});
+                    rowsByDay.forEach((rows, day) => commentsByDay.set(day, buildDayIndex(rows)));
+                }}
+                const loadDay = (day) => {{
+                    if (commentsByDay.has(day)) return Promise.resolve(commentsByDay.get(day));
+                    if (!campaignDays.includes(day)) return Promise.resolve(buildDayIndex([]));
+                    if (!pendingDays.has(day)) {{
+                        pendingDays.set(day, fetch(`${{dataUrl}}comments-${{day}}.json`)
+                            .then(response => {{
+                                if (!response.ok) throw new Error(`HTTP ${{response.status}}`);
+                                return response.json();
+                            }})
+                            .then(block => buildDayIndex(decodeComments(block)))
+                            .then(index => {{ commentsByDay.set(day, index); return index; }})
+                            .finally(() => pendingDays.delete(day)));
+                    }}
+                    return pendingDays.get(day);
+                }};
+                
+                // Índices de cada valor en las dimensiones del cubo
+                const cubeCells = Int32Array.from(cube.cells);
+                const hourStarts = cube.hours.map(h => `${{h}}:00:00`), hourEnds = cube.hours.map(h => `${{h}}:59:59`);
+                const postIndex = new Map(cube.posts.map((p, i) => [p, i]));
+                const topicIndex = new Map(cube.topics.map((t, i) => [t, i]));
+                const sentimentIndex = new Map(cube.sentiments.map((s, i) => [s, i]));
+                
+                // Conteos de gráficas y tarjetas a partir del cubo (hora × pauta × tema × sentimiento)
+                const summarize = async (filters) => {{
+                    const nHours = cube.hours.length, nPosts = cube.posts.length, nTopics = cube.topics.length, nSentiments = cube.sentiments.length;
+                    
+                    // Horas que entran completas (1), a medias (2) o nada (0) en el rango de fechas
+                    const hourState = cube.hours.map((h, i) => 
+                        (hourEnds[i] < filters.startFilter || hourStarts[i] > filters.endFilter) ? 0 : 
+                        (hourStarts[i] < filters.startFilter || hourEnds[i] > filters.endFilter) ? 2 : 1
+                    );
+                    const postOk = cube.posts.map((url, p) => matchesPost(filters, url, cube.post_platforms[p]));
+                    const topicOk = cube.topics.map(t => filters.selectedTopic === 'Todos' || t === filters.selectedTopic);
+                    
+                    const byHourSentiment = new Float64Array(nHours * nSentiments);
+                    const byTopicSentiment = new Float64Array(nTopics * nSentiments);
+                    const byPost = new Float64Array(nPosts);
+                    const topicSeen = new Uint8Array(nTopics), topicOrder = [];
+                    const add = (h, p, t, s, count) => {{
+                        if (!topicSeen[t]) {{ topicSeen[t] = 1; topicOrder.push(t); }}
+                        byHourSentiment[h * nSentiments + s] += count;
+                        byTopicSentiment[t * nSentiments + s] += count;
+                        byPost[p] += count;
+                    }};
+                    
+                    const partialHours = [];
+                    for (let i = 0; i < cubeCells.length; i += 5) {{
+                        const h = cubeCells[i];
+                        if (hourState[h] === 0) continue;
+                        if (hourState[h] === 2) {{
+                            if (!partialHours.includes(h)) partialHours.push(h);
+                            continue;
+                        }}
+                        if (postOk[cubeCells[i + 1]] && topicOk[cubeCells[i + 2]]) {{
+                            add(h, cubeCells[i + 1], cubeCells[i + 2], cubeCells[i + 3], cubeCells[i + 4]);
+                        }}
+                    }}
+                    for (const h of partialHours) {{
+                        const hour = cube.hours[h];
+                        const hourFilters = {{
+                            ...filters,
+                            startFilter: filters.startFilter > hourStarts[h] ? filters.startFilter : hourStarts[h],
+                            endFilter: filters.endFilter < hourEnds[h] ? filters.endFilter : hourEnds[h]
+                        }};
+                        queryDay(await loadDay(hour.substring(0, 10)), hourFilters, 'Todos').forEach(d => 
+                            add(h, postIndex.get(d.post_url), topicIndex.get(d.topic), sentimentIndex.get(d.sentiment), 1)
+                        );
+                    }}
+                    
+                    // Conteos por etiqueta (los temas en el orden en que aparecen)
+                    const summary = {{ total: 0, bySentiment: {{}}, byTopic: {{}}, byTopicSentiment: {{}}, byDay: {{}}, byHour: {{}}, byPost: {{}} }};
+                    topicOrder.forEach(t => {{
+                        const topic = cube.topics[t];
+                        summary.byTopicSentiment[topic] = {{ Positivo: 0, Negativo: 0, Neutro: 0 }};
+                        summary.byTopic[topic] = 0;
+                        cube.sentiments.forEach((sentiment, s) => {{
+                            const count = byTopicSentiment[t * nSentiments + s];
+                            summary.byTopicSentiment[topic][sentiment] += count;
+                            summary.byTopic[topic] += count;
+                            summary.total += count;
+                            if (count > 0) summary.bySentiment[sentiment] = (summary.bySentiment[sentiment] || 0) + count;
+                        }});
+                    }});
+                    cube.hours.forEach((hour, h) => {{
+                        const counts = byHourSentiment.subarray(h * nSentiments, (h + 1) * nSentiments);
+                        if (!counts.some(c => c > 0)) return;
+                        const day = hour.substring(0, 10), hourKey = hour + ':00:00';
+                        if (!summary.byDay[day]) summary.byDay[day] = {{ Positivo: 0, Negativo: 0, Neutro: 0 }};
+                        summary.byHour[hourKey] = {{ Positivo: 0, Negativo: 0, Neutro: 0, Total: 0 }};
+                        cube.sentiments.forEach((sentiment, s) => {{
+                            summary.byDay[day][sentiment] += counts[s];
+                            summary.byHour[hourKey][sentiment] += counts[s];
+                            summary.byHour[hourKey].Total += counts[s];
+                        }});
+                    }});
+                    cube.posts.forEach((url, p) => {{ if (byPost[p] > 0) summary.byPost[url] = byPost[p]; }});
+                    return summary;
+                }};
+                
+                // Página del listado: se recorren los días del rango del más reciente al más
+                // antiguo; los días que quedan antes de la página se saltan con sus conteos
+                // del cubo, así que solo se cargan los días que aparecen en ella
+                const getCommentsPage = async (filters, summary, sentiment, page) => {{
+                    const skip = (page - 1) * pageSize;
+                    const startDay = filters.startFilter.substring(0, 10), endDay = filters.endFilter.substring(0, 10);
+                    const pageComments = [];
+                    let seen = 0;
+                    for (const day of campaignDays) {{
+                        if (day > endDay) continue;
+                        if (day < startDay) break;
+                        const dayCounts = summary.byDay[day];
+                        if (!dayCounts) continue;
+                        const dayTotal = (sentiment === 'Todos') ? dayCounts.Positivo + dayCounts.Negativo + dayCounts.Neutro : dayCounts[sentiment];
+                        if (seen + dayTotal <= skip) {{
+                            seen += dayTotal;
+                            continue;
+                        }}
+                        const dayComments = queryDay(await loadDay(day), filters, sentiment);
+                        const from = skip - seen > 0 ? skip - seen : 0;
+                        pageComments.push(...dayComments.slice(from, from + pageSize - pageComments.length));
+                        seen += dayComments.length;
+                        if (pageComments.length === pageSize) return pageComments;
+                    }}
+                    return pageComments;
+                }};
+                
+                return {{ summarize, getCommentsPage }};
+            }};
+            
+            let engine = null;
+            self.onmessage = async (event) => {{
+                const message = event.data;
+                if (message.type === 'init') {{
+                    engine = createEngine(message);
+                    return;
+                }}
+                try {{
+                    const result = (message.type === 'summary') 
+                        ? await engine.summarize(message.filters) 
+                        : await engine.getCommentsPage(message.filters, message.summary, message.sentiment, message.page);
+                    self.postMessage({{ id: message.id, result }});
+                }} catch (error) {{
+                    self.postMessage({{ id: message.id, error: error.message }});
+                }}
+            }};
+        </script>
 
         <div class="container">
             <div class="card">
@@ -241,8 +1022,9 @@ def run_report_generation():
             }};
             
             document.addEventListener('DOMContentLoaded', () => {{
-                const allData = JSON.parse(document.getElementById('data-store').textContent);
+                const reportConfig = JSON.parse(document.getElementById('report-config').textContent);
                 const allPostsData = JSON.parse(document.getElementById('posts-data-store').textContent);
+                const cube = JSON.parse(document.getElementById('cube-store').textContent);
                 
                 const startDateInput = document.getElementById('startDate'), startTimeInput = document.getElementById('startTime');
                 const endDateInput = document.getElementById('endDate'), endTimeInput = document.getElementById('endTime');
@@ -250,7 +1032,7 @@ def run_report_generation():
                 const topicFilter = document.getElementById('topicFilter');
 
                 // Inicializar filtro de temas con los temas únicos del dataset
-                const uniqueTopics = [...new Set(allData.map(d => d.topic))].sort();
+                const uniqueTopics = [...cube.topics].sort();
                 uniqueTopics.forEach(topic => {{
                     const option = document.createElement('option');
                     option.value = topic;
@@ -346,26 +1128,76 @@ def run_report_generation():
                 const COMMENTS_PER_PAGE = 10;
                 let commentsSentimentFilter = 'Todos';
 
-                const updatePostLinks = () => {{
-                    const startFilter = `${{startDateInput.value}}T${{startTimeInput.value}}:00`;
-                    const endFilter = `${{endDateInput.value}}T${{endTimeInput.value}}:59`;
-                    const selectedPlatform = platformFilter.value;
-                    const selectedPost = postFilter.value;
-                    const selectedTopic = topicFilter.value;
-                    
-                    // Filtrar comentarios según los criterios activos (fecha, plataforma, pauta, tema)
-                    let filteredComments = allData.filter(d => d.date >= startFilter && d.date <= endFilter);
-                    
-                    // Aplicar filtros adicionales
-                    if (selectedPost !== 'Todas') {{
-                        filteredComments = filteredComments.filter(d => d.post_url === selectedPost);
-                    }} else if (selectedPlatform !== 'Todas') {{
-                        filteredComments = filteredComments.filter(d => d.platform === selectedPlatform);
-                    }}
-                    
-                    if (selectedTopic !== 'Todos') {{
-                        filteredComments = filteredComments.filter(d => d.topic === selectedTopic);
+                // Filtros activos del panel
+                const getFilters = () => ({{
+                    startFilter: `${{startDateInput.value}}T${{startTimeInput.value}}:00`,
+                    endFilter: `${{endDateInput.value}}T${{endTimeInput.value}}:59`,
+                    selectedPlatform: platformFilter.value,
+                    selectedPost: postFilter.value,
+                    selectedTopic: topicFilter.value
+                }});
+                
+                // Los filtros y conteos se calculan en un Web Worker (ver #dashboard-worker);
+                // esta página solo recibe resúmenes y páginas del listado. Si el navegador
+                // no deja crear el worker, el mismo motor corre en la página.
+                const workerSource = document.getElementById('dashboard-worker').textContent;
+                const workerRequests = new Map();
+                let workerRequestId = 0;
+                const onWorkerMessage = (event) => {{
+                    const {{ id, result, error }} = event.data;
+                    const request = workerRequests.get(id);
+                    if (!request) return;
+                    workerRequests.delete(id);
+                    if (error !== undefined) request.reject(new Error(error));
+                    else request.resolve(result);
+                }};
+                let dashboardWorker;
+                try {{
+                    dashboardWorker = new Worker(URL.createObjectURL(new Blob([workerSource], {{ type: 'text/javascript' }})));
+                    dashboardWorker.onmessage = onWorkerMessage;
+                    dashboardWorker.onerror = (event) => {{
+                        workerRequests.forEach(request => request.reject(new Error(event.message)));
+                        workerRequests.clear();
+                    }};
+                }} catch (error) {{
+                    const scope = {{ postMessage: data => onWorkerMessage({{ data }}) }};
+                    new Function('self', workerSource)(scope);
+                    dashboardWorker = {{ postMessage: data => scope.onmessage({{ data }}) }};
+                }}
+                dashboardWorker.postMessage({{
+                    type: 'init',
+                    cube: document.getElementById('cube-store').textContent,
+                    data: (reportConfig.mode === 'inline') ? document.getElementById('data-store').textContent : null,
+                    dataUrl: new URL(`${{reportConfig.data_path}}/`, document.baseURI).href,
+                    pageSize: COMMENTS_PER_PAGE
+                }});
+                const callWorker = (type, message) => new Promise((resolve, reject) => {{
+                    const id = ++workerRequestId;
+                    workerRequests.set(id, {{ resolve, reject }});
+                    dashboardWorker.postMessage({{ ...message, id, type }});
+                }});
+                
+                // Resumen compartido por updatePostLinks y updateDashboard: ambos piden el
+                // mismo filtro en cada cambio y solo el primero se lo pide al worker
+                let sharedSummary = {{ key: null, promise: null }};
+                const getSummary = (filters) => {{
+                    const key = JSON.stringify(filters);
+                    if (sharedSummary.key !== key) {{
+                        const promise = callWorker('summary', {{ filters }});
+                        sharedSummary = {{ key, promise }};
+                        promise.catch(() => {{ if (sharedSummary.promise === promise) sharedSummary = {{ key: null, promise: null }}; }});
                     }}
+                    return sharedSummary.promise;
+                }};
+                
+                let postLinksRequest = 0, dashboardRequest = 0, commentsRequest = 0;
+                
+                const updatePostLinks = async () => {{
+                    const filters = getFilters();
+                    const {{ startFilter, endFilter, selectedPlatform, selectedPost, selectedTopic }} = filters;
+                    const request = ++postLinksRequest;
+                    const summary = await getSummary(filters);
+                    if (request !== postLinksRequest) return;
                     
                     // Determinar qué pautas mostrar según el filtro de pauta/plataforma
                     let postsToShow = allPostsData;
@@ -377,7 +1209,7 @@ def run_report_generation():
                     
                     // Recalcular conteos de comentarios basados en los filtros aplicados
                     postsToShow = postsToShow.map(p => {{
-                        const filteredCount = filteredComments.filter(d => d.post_url === p.post_url).length;
+                        const filteredCount = summary.byPost[p.post_url] || 0;
                         return {{
                             ...p,
                             comment_count: filteredCount,
@@ -426,39 +1258,29 @@ def run_report_generation():
                     }}
                 }};
                 
-                const updateDashboard = () => {{
-                    const startFilter = `${{startDateInput.value}}T${{startTimeInput.value}}:00`;
-                    const endFilter = `${{endDateInput.value}}T${{endTimeInput.value}}:59`;
-                    const selectedPlatform = platformFilter.value;
-                    const selectedPost = postFilter.value;
-                    const selectedTopic = topicFilter.value;
-                    
-                    // Filtrar por fecha primero
-                    let filteredData = allData.filter(d => d.date >= startFilter && d.date <= endFilter);
+                const updateDashboard = async () => {{
+                    const filters = getFilters();
+                    const request = ++dashboardRequest;
                     let postsToShow = allPostsData;
 
                     // Filtrar por post específico
-                    if (selectedPost !== 'Todas') {{
-                        filteredData = filteredData.filter(d => d.post_url === selectedPost);
-                        postsToShow = allPostsData.filter(p => p.post_url === selectedPost);
-                    }} else if (selectedPlatform !== 'Todas') {{
-                        filteredData = filteredData.filter(d => d.platform === selectedPlatform);
-                        postsToShow = allPostsData.filter(p => p.platform === selectedPlatform);
-                    }}
-
-                    // Filtrar por tema
-                    if (selectedTopic !== 'Todos') {{
-                        filteredData = filteredData.filter(d => d.topic === selectedTopic);
+                    if (filters.selectedPost !== 'Todas') {{
+                        postsToShow = allPostsData.filter(p => p.post_url === filters.selectedPost);
+                    }} else if (filters.selectedPlatform !== 'Todas') {{
+                        postsToShow = allPostsData.filter(p => p.platform === filters.selectedPlatform);
                     }}
                     
-                    updateStats(filteredData, postsToShow.length);
-                    updateCharts(allPostsData, filteredData);
-                    updateCommentsList(filteredData);
+                    // Gráficas y tarjetas con el resumen del worker; el listado pide su página aparte
+                    const summary = await getSummary(filters);
+                    if (request !== dashboardRequest) return;
+                    updateStats(summary, postsToShow.length);
+                    updateCharts(allPostsData, summary);
+                    updateCommentsList(filters, summary);
                 }};
                 
-                const updateStats = (data, totalPosts) => {{
-                    const total = data.length;
-                    const sentiments = data.reduce((acc, curr) => {{ acc[curr.sentiment] = (acc[curr.sentiment] || 0) + 1; return acc; }}, {{}});
+                const updateStats = (summary, totalPosts) => {{
+                    const total = summary.total;
+                    const sentiments = summary.bySentiment;
                     const pos = sentiments['Positivo'] || 0;
                     const neg = sentiments['Negativo'] || 0;
                     const neu = sentiments['Neutro'] || 0;
@@ -487,9 +1309,8 @@ def run_report_generation():
                     `;
                 }};
                 
-                const updateCommentsList = (data) => {{
-                    const dataToShow = (commentsSentimentFilter === 'Todos') ? data : data.filter(d => d.sentiment === commentsSentimentFilter);
-                    dataToShow.sort((a, b) => b.date.localeCompare(a.date));
+                const updateCommentsList = async (filters, summary) => {{
+                    const totalComments = (commentsSentimentFilter === 'Todos') ? summary.total : (summary.bySentiment[commentsSentimentFilter] || 0);
 
                     const controlsDiv = document.getElementById('comments-controls');
                     const listDiv = document.getElementById('comments-list');
@@ -504,20 +1325,27 @@ def run_report_generation():
                         btn.addEventListener('click', (e) => {{
                             commentsSentimentFilter = e.target.dataset.sentiment;
                             commentsCurrentPage = 1;
-                            updateCommentsList(data);
+                            updateCommentsList(filters, summary);
                         }});
                     }});
 
-                    if (dataToShow.length === 0) {{
+                    const request = ++commentsRequest;
+                    if (totalComments === 0) {{
                         listDiv.innerHTML = "<p style='text-align:center;'>No hay comentarios para mostrar.</p>";
                         return;
                     }}
 
-                    const totalPages = Math.ceil(dataToShow.length / COMMENTS_PER_PAGE);
+                    const totalPages = Math.ceil(totalComments / COMMENTS_PER_PAGE);
                     if (commentsCurrentPage > totalPages) commentsCurrentPage = 1;
 
-                    const startIndex = (commentsCurrentPage - 1) * COMMENTS_PER_PAGE;
-                    const paginatedComments = dataToShow.slice(startIndex, startIndex + COMMENTS_PER_PAGE);
+                    let paginatedComments;
+                    try {{
+                        paginatedComments = await callWorker('page', {{ filters, summary, sentiment: commentsSentimentFilter, page: commentsCurrentPage }});
+                    }} catch (error) {{
+                        if (request === commentsRequest) listDiv.innerHTML = `<p style='text-align:center;'>No se pudieron cargar los comentarios (${{error.message}}).</p>`;
+                        return;
+                    }}
+                    if (request !== commentsRequest) return;
 
                     const sentimentToCss = {{ 'Positivo': 'positive', 'Negativo': 'negative', 'Neutro': 'neutral' }};
                     let listHtml = '';
@@ -536,12 +1364,12 @@ def run_report_generation():
 
                     if (totalPages > 1) {{
                         paginationDiv.innerHTML = `<button id="prevCommentPageBtn" ${{ (commentsCurrentPage === 1) ? 'disabled' : '' }}>Anterior</button><span>Página ${{commentsCurrentPage}} de ${{totalPages}}</span><button id="nextCommentPageBtn" ${{ (commentsCurrentPage === totalPages) ? 'disabled' : '' }}>Siguiente</button>`;
-                        document.getElementById('prevCommentPageBtn')?.addEventListener('click', () => {{ if (commentsCurrentPage > 1) {{ commentsCurrentPage--; updateCommentsList(data); }} }});
-                        document.getElementById('nextCommentPageBtn')?.addEventListener('click', () => {{ if (commentsCurrentPage < totalPages) {{ commentsCurrentPage++; updateCommentsList(data); }} }});
+                        document.getElementById('prevCommentPageBtn')?.addEventListener('click', () => {{ if (commentsCurrentPage > 1) {{ commentsCurrentPage--; updateCommentsList(filters, summary); }} }});
+                        document.getElementById('nextCommentPageBtn')?.addEventListener('click', () => {{ if (commentsCurrentPage < totalPages) {{ commentsCurrentPage++; updateCommentsList(filters, summary); }} }});
                     }}
                 }};
 
-                const updateCharts = (postsData, filteredData) => {{ 
+                const updateCharts = (postsData, summary) => {{ 
                     // Gráfico de pautas por plataforma
                     const postCounts = postsData.reduce((acc, curr) => {{ acc[curr.platform] = (acc[curr.platform] || 0) + 1; return acc; }}, {{}}); 
                     const postCountLabels = Object.keys(postCounts); 
@@ -550,13 +1378,13 @@ def run_report_generation():
                     charts.postCount.update(); 
                     
                     // Gráfico de sentimientos
-                    const sentimentCounts = filteredData.reduce((acc, curr) => {{ acc[curr.sentiment] = (acc[curr.sentiment] || 0) + 1; return acc; }}, {{}}); 
+                    const sentimentCounts = summary.bySentiment; 
                     charts.sentiment.data.labels = ['Positivo', 'Negativo', 'Neutro']; 
                     charts.sentiment.data.datasets = [{{ data: [sentimentCounts['Positivo']||0, sentimentCounts['Negativo']||0, sentimentCounts['Neutro']||0], backgroundColor: ['#28a745', '#dc3545', '#ffc107'] }}]; 
                     charts.sentiment.update(); 
                     
                     // Gráfico de pastel por temas
-                    const topicCounts = filteredData.reduce((acc, curr) => {{ acc[curr.topic] = (acc[curr.topic] || 0) + 1; return acc; }}, {{}}); 
+                    const topicCounts = summary.byTopic; 
                     const sortedTopics = Object.entries(topicCounts).sort((a, b) => b[1] - a[1]); 
                     const topicLabels = sortedTopics.map(d => d[0]);
                     const topicData = sortedTopics.map(d => d[1]);
@@ -572,7 +1400,7 @@ def run_report_generation():
                     charts.topics.update(); 
                     
                     // Sentimiento por tema (gráfico de barras)
-                    const sbtCounts = filteredData.reduce((acc, curr) => {{ if (!acc[curr.topic]) acc[curr.topic] = {{ Positivo: 0, Negativo: 0, Neutro: 0 }}; acc[curr.topic][curr.sentiment]++; return acc; }}, {{}}); 
+                    const sbtCounts = summary.byTopicSentiment; 
                     const sbtLabels = Object.keys(sbtCounts).sort((a,b) => (sbtCounts[b].Positivo + sbtCounts[b].Negativo + sbtCounts[b].Neutro) - (sbtCounts[a].Positivo + sbtCounts[a].Negativo + sbtCounts[a].Neutro)); 
                     charts.sentimentByTopic.data.labels = sbtLabels; 
                     charts.sentimentByTopic.data.datasets = [ 
@@ -583,7 +1411,7 @@ def run_report_generation():
                     charts.sentimentByTopic.update(); 
                     
                     // Volumen diario
-                    const dailyCounts = filteredData.reduce((acc, curr) => {{ const day = curr.date.substring(0, 10); if (!acc[day]) {{ acc[day] = {{ Positivo: 0, Negativo: 0, Neutro: 0 }}; }} acc[day][curr.sentiment]++; return acc; }}, {{}}); 
+                    const dailyCounts = summary.byDay; 
                     const sortedDays = Object.keys(dailyCounts).sort(); 
                     charts.daily.data.labels = sortedDays.map(d => new Date(d+'T00:00:00').toLocaleDateString('es-CO', {{ year: 'numeric', month: 'short', day: 'numeric' }})); 
                     charts.daily.data.datasets = [ 
@@ -594,7 +1422,7 @@ def run_report_generation():
                     charts.daily.update(); 
                     
                     // Volumen por hora
-                    const hourlyCounts = filteredData.reduce((acc, curr) => {{ const hour = curr.date.substring(0, 13) + ':00:00'; if (!acc[hour]) acc[hour] = {{ Positivo: 0, Negativo: 0, Neutro: 0, Total: 0 }}; acc[hour][curr.sentiment]++; acc[hour].Total++; return acc; }}, {{}}); 
+                    const hourlyCounts = summary.byHour; 
                     const sortedHours = Object.keys(hourlyCounts).sort(); 
                     let cumulative = 0; 
                     const cumulativeData = sortedHours.map(h => {{ cumulative += hourlyCounts[h].Total; return cumulative; }}); 
@@ -639,7 +1467,16 @@ def run_report_generation():
         f.write(html_content)
     
     print(f"✅ Panel interactivo mejorado generado con éxito. Se guardó como '{report_filename}'.")
+    if output_mode == 'shards':
+        print(f"   Los comentarios se descargan de '{data_dir}/': publica la carpeta junto a "
+              f"'{report_filename}' y ábrelo por HTTP (p. ej. python -m http.server).")
+    analysis_memo.print_stats()
+    print(f"Tiempo total de generación del informe: {time.perf_counter() - report_start:.1f}s")
 
 
 if __name__ == "__main__":
-    run_report_generation()
+    if "--benchmark-sentiment" in sys.argv:
+        args = sys.argv[sys.argv.index("--benchmark-sentiment") + 1:]
+        benchmark_sentiment_backends(int(args[0]) if args else 500)
+    else:
+        run_report_generation()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests del almacenamiento SQLite: escribir solo la diferencia en cada
+ejecución (append_comments) debe dejar la misma tabla que reescribirla
+entera (save_comments).
+
+Ejecutar con: python -m pytest tests
+"""
+import sys
+from datetime import date, time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from almacenamiento import append_comments, load_comments, save_comments
+
+
+def comment(post_number, platform, text, created_time, likes=0):
+    """Fila de comentario como la deja merge_comments"""
+    unit = 's' if isinstance(created_time, int) else None
+    processed = pd.to_datetime(created_time, unit=unit, utc=True).tz_localize(None)
+    return {
+        'post_number': post_number,
+        'platform': platform,
+        'campaign_name': 'Navidad',
+        'post_url': f'https://example.com/{platform.lower()}/{post_number}',
+        'post_url_original': f'https://example.com/{platform.lower()}/{post_number}?ref=1',
+        'author_name': f'autor {text}',
+        'comment_text': text,
+        'created_time': created_time,
+        'created_time_processed': processed,
+        'fecha_comentario': processed.date(),
+        'hora_comentario': processed.time(),
+        'likes_count': likes,
+        'replies_count': 0,
+        'is_reply': False,
+        'author_url': None,
+        'extraction_status': 'Success',
+        'created_time_raw': str(created_time),
+        '_comment_hash': f'{platform}|{post_number}|{text}',
+    }
+
+
+def registry(post_number, platform):
+    """Entrada de registro de un post sin comentarios"""
+    return {
+        'post_number': post_number,
+        'platform': platform,
+        'campaign_name': 'Navidad',
+        'post_url': f'https://example.com/{platform.lower()}/{post_number}',
+        'post_url_original': f'https://example.com/{platform.lower()}/{post_number}?ref=1',
+        'author_name': None,
+        'comment_text': None,
+        'created_time': None,
+        'created_time_processed': pd.NaT,
+        'fecha_comentario': None,
+        'hora_comentario': None,
+        'likes_count': 0,
+        'replies_count': 0,
+        'is_reply': False,
+        'author_url': None,
+        'extraction_status': 'No Comments',
+        'created_time_raw': None,
+        '_comment_hash': f'{platform}|{post_number}|registro',
+    }
+
+
+def sorted_table(df):
+    return df.sort_values('_comment_hash').reset_index(drop=True)
+
+
+def test_append_over_several_runs_matches_full_save(tmp_path):
+    first = [
+        comment(1, 'Facebook', 'qué rico', 1734000000, likes=3),
+        comment(1, 'Facebook', 'lo quiero', '2024-12-12T10:15:00.000Z'),
+        registry(2, 'Instagram'),
+    ]
+    # El post 2 ya tiene comentarios (su registro desaparece) y aparece un
+    # post nuevo sin comentarios
+    second = first[:2] + [
+        comment(2, 'Instagram', 'jajaja', '2024-12-13T08:00:00Z', likes=1),
+        registry(3, 'TikTok'),
+    ]
+    third = second + [
+        comment(1, 'Facebook', 'feliz navidad', 1734100000),
+        comment(3, 'TikTok', 'top', 1734200000, likes=7),
+    ]
+    third.remove(registry(3, 'TikTok'))
+
+    appended = tmp_path / 'append.db'
+    for rows in (first, second, third):
+        assert append_comments(str(appended), pd.DataFrame(rows))
+
+    rewritten = tmp_path / 'save.db'
+    assert save_comments(str(rewritten), pd.DataFrame(third))
+
+    df_appended = sorted_table(load_comments(str(appended)))
+    df_rewritten = sorted_table(load_comments(str(rewritten)))
+    pd.testing.assert_frame_equal(df_appended, df_rewritten)
+    assert df_appended['_comment_hash'].tolist() == sorted(row['_comment_hash'] for row in third)
+    assert df_appended['comment_text'].notna().all()
+    assert all(isinstance(value, date) for value in df_appended['fecha_comentario'])
+    assert all(isinstance(value, time) for value in df_appended['hora_comentario'])
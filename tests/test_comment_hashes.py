@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests del hash de comentarios: la versión vectorizada (create_comment_hashes)
+debe dar exactamente los mismos hashes que aplicar create_unique_comment_hash
+fila por fila, para que los datos guardados sigan siendo compatibles.
+
+Ejecutar con: python -m pytest tests
+"""
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from extraer_comentarios import create_comment_hashes, create_unique_comment_hash
+
+WORKBOOK = REPO_DIR / "Comentarios Campaña.xlsx"
+
+CREATED_TIMES = [
+    1734000000,
+    np.int64(1734000001),
+    1734000002.0,
+    np.float64(1734000003.7),
+    '1734000004',
+    '2024-12-12T10:15:00.000Z',
+    '2024-12-12T10:15:00+0000',
+    '2024-12-12T05:15:00-05:00',
+    '2024-12-12 10:15:00',
+    '2024-12-12',
+    '12/25/2024 10:00',
+    'ayer',
+    '',
+    pd.Timestamp('2024-12-12 10:15:00'),
+    pd.Timestamp('2024-12-12 10:15:00', tz='UTC'),
+    datetime(2024, 12, 12, 10, 15, tzinfo=timezone.utc),
+    float('nan'),
+    None,
+    pd.NaT,
+]
+
+
+def row_hashes(df):
+    return df.apply(create_unique_comment_hash, axis=1)
+
+
+def assert_same_hashes(df):
+    hashes = create_comment_hashes(df)
+    assert hashes.index.equals(df.index)
+    assert hashes.tolist() == row_hashes(df).tolist()
+
+
+def comments_frame(created_times):
+    count = len(created_times)
+    return pd.DataFrame({
+        'platform': ['Facebook', ' Instagram ', 'TIKTOK'] * (count // 3) + ['Facebook'] * (count % 3),
+        'post_url': [f' https://example.com/post/{i % 4} ' for i in range(count)],
+        'comment_text': [f'comentario {i % 5}' for i in range(count)],
+        'created_time': pd.Series(created_times, dtype=object),
+        'extraction_status': 'Success',
+    })
+
+
+@pytest.mark.skipif(not WORKBOOK.exists(), reason="workbook not available")
+def test_hashes_match_rowwise_on_workbook():
+    df = pd.read_excel(WORKBOOK, sheet_name='Comentarios')
+    assert_same_hashes(df)
+    assert_same_hashes(df.drop(columns=['_comment_hash'], errors='ignore').iloc[::-1])
+
+
+def test_hashes_match_rowwise_on_mixed_created_time():
+    df = comments_frame(CREATED_TIMES * 2)
+    assert_same_hashes(df)
+    # Mismo contenido con un índice no consecutivo y repetido
+    assert_same_hashes(df.set_axis([7, 7, 3] + list(range(100, 100 + len(df) - 3))))
+
+
+@pytest.mark.parametrize('created_times', [
+    [1734000000, 1734000001, 1734000002],
+    [1734000000.0, float('nan'), 1734000002.5],
+    ['2024-12-12T10:15:00.000Z', '2024-12-13T11:00:00.000Z', None],
+    [pd.Timestamp('2024-12-12 10:15:00'), pd.NaT, pd.Timestamp('2024-12-13')],
+], ids=['int', 'float', 'iso', 'timestamp'])
+def test_hashes_match_rowwise_on_typed_created_time(created_times):
+    df = comments_frame(created_times)
+    df['created_time'] = pd.Series(created_times)
+    assert_same_hashes(df)
+
+
+def test_hashes_match_rowwise_on_registry_rows():
+    df = comments_frame(CREATED_TIMES[:6])
+    df['comment_text'] = ['texto', None, '', '   ', float('nan'), 'otro']
+    df.loc[2, 'extraction_status'] = None
+    assert_same_hashes(df)
+    assert create_comment_hashes(df).str.startswith('REGISTRY_').sum() == 4
+
+
+@pytest.mark.parametrize('missing', [
+    ['created_time'],
+    ['platform'],
+    ['post_url'],
+    ['comment_text'],
+    ['extraction_status'],
+    ['comment_text', 'extraction_status'],
+    ['platform', 'post_url', 'created_time'],
+])
+def test_hashes_match_rowwise_with_missing_columns(missing):
+    df = comments_frame(CREATED_TIMES).drop(columns=missing)
+    assert_same_hashes(df)
+
+
+def test_hashes_of_empty_frame():
+    df = comments_frame([]).iloc[0:0]
+    assert create_comment_hashes(df).empty
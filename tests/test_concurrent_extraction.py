@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests del reparto de URLs entre workers en la extracción concurrente: el
+límite por plataforma no debe dejar workers ociosos mientras haya URLs de
+otras plataformas pendientes.
+
+Ejecutar con: python -m pytest tests
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import extraer_comentarios
+
+SETTINGS = {
+    'max_workers': 4,
+    'max_workers_per_platform': {'TikTok': 2, 'Facebook': 2, 'Instagram': 2},
+    'pause_between_urls_min': 0,
+    'pause_between_urls_max': 0,
+}
+
+# Misma proporción que config/urls.txt: pocas de TikTok, muchas de Facebook
+# e Instagram, agrupadas por plataforma
+TASKS = (
+    [(f'https://www.tiktok.com/{i}', 'TikTok', i) for i in range(1, 3)]
+    + [(f'https://www.facebook.com/{i}', 'Facebook', i) for i in range(3, 13)]
+    + [(f'https://www.instagram.com/{i}', 'Instagram', i) for i in range(13, 23)]
+)
+
+
+class FakeExtraction:
+    """Sustituye a la extracción real y anota la concurrencia alcanzada."""
+
+    def __init__(self, duration=0.1):
+        self.duration = duration
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = {}
+
+    def _enter(self, platform):
+        with self.lock:
+            for key in ('all', platform):
+                self.running[key] = self.running.get(key, 0) + 1
+                self.peak[key] = max(self.peak.get(key, 0), self.running[key])
+
+    def _exit(self, platform):
+        with self.lock:
+            for key in ('all', platform):
+                self.running[key] -= 1
+
+    def __call__(self, scraper, url, platform, post_number, max_comments, campaign_info, position=None):
+        self._enter(platform)
+        time.sleep(self.duration)
+        self._exit(platform)
+        return [{'post_url': url, 'platform': platform}]
+
+
+class FakeAsyncExtraction(FakeExtraction):
+    """Versión asíncrona de FakeExtraction."""
+
+    async def __call__(self, scraper, url, platform, post_number, max_comments, campaign_info, position=None):
+        self._enter(platform)
+        await asyncio.sleep(self.duration)
+        self._exit(platform)
+        return [{'post_url': url, 'platform': platform}]
+
+
+@pytest.fixture
+def fake_extraction(monkeypatch):
+    fake = FakeExtraction()
+    monkeypatch.setattr(extraer_comentarios, 'extract_single_url', fake)
+    return fake
+
+
+@pytest.fixture
+def fake_async_extraction(monkeypatch):
+    fake = FakeAsyncExtraction()
+    monkeypatch.setattr(extraer_comentarios, 'extract_single_url_async', fake)
+    return fake
+
+
+def test_concurrent_extraction_fills_all_workers(fake_extraction):
+    start = time.monotonic()
+    comments = extraer_comentarios.run_concurrent_extraction(None, TASKS, SETTINGS, 10, {})
+    rounds = (time.monotonic() - start) / fake_extraction.duration
+
+    assert [c['post_url'] for c in comments] == [url for url, _, _ in TASKS]
+    assert fake_extraction.peak['all'] == SETTINGS['max_workers']
+    for platform, limit in SETTINGS['max_workers_per_platform'].items():
+        assert fake_extraction.peak[platform] <= limit
+    # 22 URLs con 4 workers caben en 6 rondas; si un worker se queda
+    # esperando a una plataforma llena se necesitan unas 9
+    assert rounds < 8
+
+
+def test_async_extraction_fills_all_workers(fake_async_extraction):
+    start = time.monotonic()
+    comments = extraer_comentarios.run_async_extraction(None, TASKS, SETTINGS, 10, {})
+    rounds = (time.monotonic() - start) / fake_async_extraction.duration
+
+    assert [c['post_url'] for c in comments] == [url for url, _, _ in TASKS]
+    assert fake_async_extraction.peak['all'] == SETTINGS['max_workers']
+    for platform, limit in SETTINGS['max_workers_per_platform'].items():
+        assert fake_async_extraction.peak[platform] <= limit
+    assert rounds < 8
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de regresión del clasificador de temas: el motor de reglas
+(config/topic_classifier.py con topic_rules/navidad.json) debe asignar
+exactamente los mismos temas que el clasificador V3 original.
+
+Ejecutar con: python -m pytest tests
+"""
+import json
+import random
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+TESTS_DIR = Path(__file__).parent
+REPO_DIR = TESTS_DIR.parent
+sys.path.insert(0, str(REPO_DIR / "config"))
+sys.path.insert(0, str(TESTS_DIR))
+
+from topic_classifier import TopicClassifier, load_topic_rules
+from topic_classifier_v3 import create_topic_classifier as create_v3_classifier
+
+NAVIDAD_RULES = REPO_DIR / "config" / "topic_rules" / "navidad.json"
+GOLDEN_LABELS = TESTS_DIR / "data" / "topic_labels_v3.json"
+WORKBOOK = REPO_DIR / "Comentarios Campaña.xlsx"
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return TopicClassifier(load_topic_rules(NAVIDAD_RULES))
+
+
+@pytest.fixture(scope="module")
+def golden_labels():
+    with open(GOLDEN_LABELS, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fuzz_comments(count=20000, seed=1):
+    """
+    Comentarios sintéticos combinando fragmentos de las reglas V3, trozos de
+    comentarios reales y casos límite (mayúsculas, espacios, saltos de línea).
+    """
+    with open(GOLDEN_LABELS, 'r', encoding='utf-8') as f:
+        base = list(json.load(f))
+
+    # Fragmentos sacados de las expresiones del clasificador V3 (no del
+    # archivo de reglas, para detectar también palabras que falten en él)
+    v3_source = (TESTS_DIR / "topic_classifier_v3.py").read_text(encoding='utf-8')
+    fragments = []
+    for pattern in re.findall(r"r'([^']*)'", v3_source):
+        for alternative in pattern.split('|'):
+            fragments.append(re.sub(r'\\b|\\\$|[\[\]()?*+^$\\{}]|\.\*', '', alternative))
+    fragments += ['ty', 'si', 'no', 'ok', 'top', 'wow']
+    fragments += ['vuuuuuu', 'Pp099', '6', '123', 'jajaja', '  ', '\n', 'x', 'ab', '🤡', 'ñ', 'NO ES IA']
+
+    rng = random.Random(seed)
+    comments = []
+    for _ in range(count):
+        parts = [
+            rng.choice(fragments) if rng.random() < 0.6 else rng.choice(base)[:rng.randint(0, 30)]
+            for _ in range(rng.randint(0, 4))
+        ]
+        comment = rng.choice([' ', '', '\n', ' . ']).join(parts)
+        if rng.random() < 0.3:
+            comment = comment.upper()
+        if rng.random() < 0.1:
+            comment = '  ' + comment + ' \n'
+        comments.append(comment)
+    return comments
+
+
+def test_golden_labels_match_v3(golden_labels):
+    classify_v3 = create_v3_classifier()
+    assert {text: classify_v3(text) for text in golden_labels} == golden_labels
+
+
+@pytest.mark.skipif(not WORKBOOK.exists(), reason="workbook not available")
+def test_golden_labels_cover_workbook(golden_labels):
+    comments = pd.read_excel(WORKBOOK, sheet_name='Comentarios')['comment_text'].dropna()
+    assert {str(comment) for comment in comments} <= set(golden_labels)
+
+
+def test_classify_matches_golden_labels(classifier, golden_labels):
+    mismatches = {
+        text: (expected, classifier.classify(text))
+        for text, expected in golden_labels.items()
+        if classifier.classify(text) != expected
+    }
+    assert not mismatches
+
+
+def test_classify_series_matches_golden_labels(classifier, golden_labels):
+    texts = pd.Series(list(golden_labels), dtype=object)
+    assert classifier.classify_series(texts).tolist() == list(golden_labels.values())
+
+
+def test_classify_matches_v3_on_fuzzed_comments(classifier):
+    classify_v3 = create_v3_classifier()
+    comments = fuzz_comments()
+    mismatches = [
+        (comment, classify_v3(comment), classifier.classify(comment))
+        for comment in comments
+        if classify_v3(comment) != classifier.classify(comment)
+    ]
+    assert not mismatches[:20]
+
+
+def test_classify_series_matches_v3_on_fuzzed_comments(classifier):
+    classify_v3 = create_v3_classifier()
+    comments = pd.Series(fuzz_comments(count=5000, seed=2), dtype=object)
+    assert classifier.classify_series(comments).tolist() == [classify_v3(c) for c in comments]
+
+
+def test_classify_series_keeps_any_index(classifier):
+    comments = pd.Series(['no es ia', 'ok', '', 'jajaja que rico'], index=[0, 0, 1, 1])
+    topics = classifier.classify_series(comments)
+    assert topics.index.equals(comments.index)
+    assert topics.tolist() == [classifier.classify(comment) for comment in comments]
+    shuffled = comments.set_axis(['b', 'a', 'b', 'c'])
+    assert classifier.classify_series(shuffled).tolist() == topics.tolist()